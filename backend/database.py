@@ -1,6 +1,11 @@
 import os
+import asyncio
+import functools
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Supabase Credentials (loaded from Env or hardcoded for now as requested)
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://vxafzadreiuifilbybxb.supabase.co")
@@ -8,8 +13,44 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "https://vxafzadreiuifilbybxb.supabase.
 # If writes fail, we will need service_role key.
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "sb_publishable_zCqe4ibxMCR8YbL545gjHw_8v3H28FK")
 
+# PostgREST/Postgres codes meaning "relation or column does not exist"
+# (backend/sql/trend_batches.sql not applied yet)
+MISSING_SCHEMA_CODES = {"42P01", "42703", "PGRST204", "PGRST205"}
+
+# Rows per select request. Supabase cuts unpaged selects off at its max-rows
+# setting (1000 by default); keep this at or below it.
+SUPABASE_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+
+def is_missing_schema(error: Exception):
+    return getattr(error, "code", None) in MISSING_SCHEMA_CODES
+
+def build_batch(category: str, trends: list):
+    """
+    Turn scraped trends into the rows of one batch (shared batch_id/created_at).
+    Returns:
+        list: [{"category", "keyword", "rank", "created_at", "batch_id"}, ...]
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    batch_id = str(uuid.uuid4())
+    rows = []
+    for rank, item in enumerate(trends):
+        keyword = item["keyword"] if isinstance(item, dict) else item
+        rows.append({
+            "category": category,
+            "keyword": keyword,
+            "rank": rank + 1,
+            "created_at": now,
+            "batch_id": batch_id
+        })
+    return rows
+
 class Database:
+    CATEGORIES = ["all", "Fashion", "Digital", "Food", "Living"]
+
     def __init__(self):
+        # False once we detect the pre-batch_id schema (see backend/sql/trend_batches.sql)
+        self.batches_supported = True
+        self.page_size = SUPABASE_PAGE_SIZE
         try:
             self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
             print(f"[DB] Connected to Supabase at {SUPABASE_URL}")
@@ -20,32 +61,59 @@ class Database:
     def save_trends(self, category: str, trends: list):
         """
         Save a batch of trends to 'trends' table.
-        replaces existing trends for this category?
-        Strategy: Insert with current timestamp. We can query 'latest' by timestamp.
+        Strategy: every row carries the same batch_id; once the whole batch is
+        inserted, the category's pointer in 'trend_batches' is moved to it.
+        (Schema: backend/sql/trend_batches.sql)
+        Returns:
+            list: the saved batch in get_latest_trends format, or None on failure.
         """
-        if not self.client: return
+        if not self.client: return None
         
+        rows = build_batch(category, trends)
         try:
-            # Prepare data
-            rows = []
-            now = datetime.now().isoformat()
-            for rank, item in enumerate(trends):
-                keyword = item["keyword"] if isinstance(item, dict) else item
-                rows.append({
-                    "category": category,
-                    "keyword": keyword,
-                    "rank": rank + 1,
-                    "created_at": now
-                })
-                
-            # Insert
-            # Note: If RLS is enabled and Anon key doesn't have INSERT permission, this will fail.
-            print(f"[DB] Saving {len(rows)} trends for {category}...")
-            # We assume table 'trends' exists.
-            self.client.table("trends").insert(rows).execute()
-            print("[DB] Trends saved successfully.")
+            self.save_trend_batches({category: rows})
+            return rows
         except Exception as e:
             print(f"[DB] Failed to save trends: {e}")
+            return None
+
+    def save_trend_batches(self, batches: dict):
+        """
+        Bulk write of several pre-built batches ({category: rows from build_batch}):
+        one insert for all rows, then one upsert moving every pointer.
+        Raises on failure so callers (WriteBehindQueue) can retry. The legacy
+        schema is only used when the batch schema is missing, never after the
+        batch insert went through.
+        """
+        if not self.client: raise RuntimeError("Supabase client unavailable")
+
+        rows = [row for batch in batches.values() for row in batch]
+        if not rows: return
+
+        # Note: If RLS is enabled and Anon key doesn't have INSERT permission, this will fail.
+        print(f"[DB] Saving {len(rows)} trends for {', '.join(batches)}...")
+        if self.batches_supported:
+            try:
+                # Idempotent: a retry after a partial write does not duplicate rows
+                self.client.table("trends").upsert(rows, on_conflict="batch_id,rank", ignore_duplicates=True).execute()
+            except Exception as e:
+                if not is_missing_schema(e):
+                    raise
+                print(f"[DB] Batch schema missing ({e}). Is backend/sql/trend_batches.sql applied? Using legacy schema.")
+                self.batches_supported = False
+            else:
+                # Pointers move only after the batches are complete.
+                # Errors propagate: the rows are in, a retry only has to move the pointers.
+                self.client.table("trend_batches").upsert([
+                    {"category": cat, "batch_id": batch[0]["batch_id"], "size": len(batch), "created_at": batch[0]["created_at"]}
+                    for cat, batch in batches.items() if batch
+                ]).execute()
+                print("[DB] Trends saved successfully.")
+                return
+
+        legacy_rows = [{k: v for k, v in row.items() if k != "batch_id"} for row in rows]
+        self.client.table("trends").insert(legacy_rows).execute()
+        print("[DB] Trends saved successfully (legacy).")
 
     def get_latest_trends(self, category: str):
         """
@@ -53,14 +121,82 @@ class Database:
         """
         if not self.client: return []
         
+        if self.batches_supported:
+            try:
+                rows = self._select_all(lambda: self.client.table("latest_trends")
+                    .select("*")
+                    .eq("category", category)
+                    .order("rank"))
+                formatted = [self._format_trend(item) for item in rows]
+                print(f"[DB] Loaded {len(formatted)} trends from DB for {category}")
+                return formatted
+            except Exception as e:
+                if not is_missing_schema(e):
+                    raise
+                print(f"[DB] latest_trends view unavailable ({e}). Using legacy query.")
+                self.batches_supported = False
+
+        return self._get_latest_trends_legacy(category)
+
+    def get_latest_batches(self):
+        """
+        Latest complete batch of EVERY category in one query.
+        Returns:
+            dict: {"Fashion": [...], "all": [...], ...} (each list sorted by rank)
+        """
+        if not self.client: return {}
+
+        if not self.batches_supported:
+            return {cat: trends for cat in self.CATEGORIES if (trends := self._get_latest_trends_legacy(cat))}
+
+        try:
+            rows = self._select_all(lambda: self.client.table("latest_trends")
+                .select("*")
+                .order("category")
+                .order("rank"))
+        except Exception as e:
+            if not is_missing_schema(e):
+                raise
+            print(f"[DB] latest_trends view unavailable ({e}). Using legacy query.")
+            self.batches_supported = False
+            return self.get_latest_batches()
+
+        batches = {}
+        for item in rows:
+            batches.setdefault(item["category"], []).append(self._format_trend(item))
+        print(f"[DB] Loaded latest batches for {len(batches)} categories")
+        return batches
+
+    def _select_all(self, build_query):
+        """
+        Run a select page by page (.range), so deep rankings are not silently
+        truncated by Supabase's max-rows limit.
+        Args:
+            build_query: callable returning a fresh, ordered query
+        Returns:
+            list: every row
+        """
+        rows = []
+        while True:
+            page = build_query().range(len(rows), len(rows) + self.page_size - 1).execute().data
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+
+    def _format_trend(self, item):
+        return {
+            "keyword": item["keyword"],
+            "rank": item["rank"],
+            "category": item["category"],
+            "created_at": item["created_at"],
+            "batch_id": item.get("batch_id")
+        }
+
+    def _get_latest_trends_legacy(self, category: str):
+        """
+        Pre-batch_id schema: newest rows by created_at, grouped by identical timestamp.
+        """
         try:
-            # Subquery strategy is complex in simple API.
-            # Simple strategy: Fetch last 20 items for category order by created_at desc
-            # This might mix multiple batches if we are not careful.
-            # Better: Fetch latest created_at for this category first?
-            # Or just fetch last 100 and dedup in python.
-            # Let's try to order by created_at desc limit 20.
-            
             response = self.client.table("trends") \
                 .select("*") \
                 .eq("category", category) \
@@ -69,29 +205,16 @@ class Database:
                 .execute()
             
             data = response.data
-            
-            # Post-process: Filter to include only the very latest batch?
-            # If we fetch 20, and batch size is 10, we might get 2 batches.
-            # We should group by 'created_at' batch.
             if not data: return []
             
-            # Find the latest timestamp
+            # Grouping by timestamp (batch insert uses identical string timestamp)
             latest_ts = data[0]["created_at"]
-            # Filter only items with that timestamp (allowing small window?)
-            # Actually, created_at might differ slightly if inserted mostly same time.
-            # Ideally we insert with same timestamp string.
-            
-            # Grouping by timestamp
             latest_batch = [item for item in data if item["created_at"] == latest_ts]
             
-            # If batch is small (e.g. 1 item?), maybe fallback?
-            # Assuming batch insert uses identical string timestamp.
-            
             # Sort by rank
             latest_batch.sort(key=lambda x: x["rank"])
             
-            # Format back to simple list/dict
-            formatted = [{"keyword": item["keyword"], "rank": item["rank"], "category": item["category"], "created_at": item["created_at"]} for item in latest_batch]
+            formatted = [self._format_trend(item) for item in latest_batch]
             print(f"[DB] Loaded {len(formatted)} trends from DB for {category}")
             return formatted
             
@@ -106,7 +229,7 @@ class Database:
         if not self.client: return
         
         try:
-            now = datetime.now().isoformat()
+            now = datetime.now(timezone.utc).isoformat()
             data = {
                 "keyword": keyword,
                 "reason": reason,
@@ -120,6 +243,21 @@ class Database:
         except Exception as e:
             print(f"[DB] Failed to save analysis: {e}")
 
+    def save_analyses(self, items: list):
+        """
+        Bulk upsert of analysis results: [{"keyword", "reason", "chart_data"}, ...].
+        Raises on failure so callers (WriteBehindQueue) can retry.
+        """
+        if not self.client: raise RuntimeError("Supabase client unavailable")
+        if not items: return
+
+        now = datetime.now(timezone.utc).isoformat()
+        self.client.table("trend_analysis").upsert([
+            {"keyword": item["keyword"], "reason": item["reason"], "chart_data": item["chart_data"], "updated_at": now}
+            for item in items
+        ]).execute()
+        print(f"[DB] Saved {len(items)} analyses")
+
     def get_analysis(self, keyword: str):
         """
         Get analysis for a keyword.
@@ -145,3 +283,83 @@ class Database:
         except Exception as e:
             print(f"[DB] Failed to get analysis: {e}")
             return None
+
+def create_store(backend: str = None):
+    """
+    Pick the storage backend (STORAGE_BACKEND env):
+    - "supabase" (default): Supabase only
+    - "sqlite": embedded SQLite only (offline / single box)
+    - "replica": Supabase + local SQLite write-through replica serving all reads
+    """
+    from backend.local_store import SQLiteStore, ReplicatedStore
+
+    backend = backend or os.getenv("STORAGE_BACKEND", "supabase")
+    if backend == "sqlite":
+        return SQLiteStore()
+    if backend == "replica":
+        return ReplicatedStore(Database(), SQLiteStore())
+    return Database()
+
+class AsyncDatabase:
+    """
+    Async facade over a storage backend (Database, SQLiteStore,
+    ReplicatedStore) with the same method surface.
+    - One shared Supabase client per process (its httpx session keeps
+      connections alive and pooled).
+    - Every call runs on a dedicated, bounded thread pool, never on the
+      event loop thread and never competing with the default to_thread pool.
+    - Per-query latency is recorded in `timings`.
+    """
+    def __init__(self, db=None, max_workers: int = None):
+        self.db = db or create_store()
+        max_workers = max_workers or int(os.getenv("DB_POOL_SIZE", "8"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self.timings = {}
+
+    async def save_trends(self, category: str, trends: list):
+        return await self._run("save_trends", category, trends)
+
+    async def get_latest_trends(self, category: str):
+        return await self._run("get_latest_trends", category)
+
+    async def get_latest_batches(self):
+        return await self._run("get_latest_batches")
+
+    async def save_trend_batches(self, batches: dict):
+        return await self._run("save_trend_batches", batches)
+
+    async def save_analysis(self, keyword: str, reason: str, chart_data: list):
+        return await self._run("save_analysis", keyword, reason, chart_data)
+
+    async def save_analyses(self, items: list):
+        return await self._run("save_analyses", items)
+
+    async def get_analysis(self, keyword: str):
+        return await self._run("get_analysis", keyword)
+
+    async def _run(self, method: str, *args):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(getattr(self.db, method), *args))
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats = self.timings.setdefault(method, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + elapsed_ms, 1)
+            stats["max_ms"] = round(max(stats["max_ms"], elapsed_ms), 1)
+            print(f"[DB] {method} took {elapsed_ms:.0f}ms")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+_shared_db = None
+
+def get_database():
+    """
+    Process-wide AsyncDatabase shared by the collector and analyzer.
+    """
+    global _shared_db
+    if _shared_db is None:
+        _shared_db = AsyncDatabase()
+    return _shared_db
@@ -0,0 +1,302 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from backend.database import Database, build_batch
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join("data", "ktrend.db"))
+# Local batches older than this are re-checked against the primary (same window as the collector's staleness check)
+REPLICA_MAX_AGE = float(os.getenv("REPLICA_MAX_AGE", "3600"))
+# ... but the primary is asked at most this often
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "60"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trends (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    batch_id TEXT NOT NULL
+);
+-- Unique: a retried batch write is ignored instead of duplicating rows
+CREATE UNIQUE INDEX IF NOT EXISTS trends_batch_id_rank_key ON trends (batch_id, rank);
+
+CREATE TABLE IF NOT EXISTS trend_batches (
+    category TEXT PRIMARY KEY,
+    batch_id TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS trend_analysis (
+    keyword TEXT PRIMARY KEY,
+    reason TEXT,
+    chart_data TEXT,
+    updated_at TEXT NOT NULL
+);
+"""
+
+class SQLiteStore:
+    """
+    Embedded storage backend with the same method surface as Database.
+    WAL mode lets the API read while the collector writes. One connection per
+    thread (AsyncDatabase calls us from its thread pool).
+    """
+    def __init__(self, path: str = None):
+        self.path = path or SQLITE_PATH
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        print(f"[DB] Using SQLite at {self.path}")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_trends(self, category: str, trends: list):
+        """
+        Save a batch and move the category's latest-batch pointer to it.
+        Returns:
+            list: the saved batch in get_latest_trends format, or None on failure.
+        """
+        rows = build_batch(category, trends)
+        try:
+            self.import_batch(category, rows)
+            print(f"[DB] Saved {len(rows)} trends for {category} (SQLite).")
+            return rows
+        except Exception as e:
+            print(f"[DB] Failed to save trends (SQLite): {e}")
+            return None
+
+    def save_trend_batches(self, batches: dict):
+        """Bulk write of pre-built batches in one transaction. Raises on failure."""
+        conn = self._conn()
+        with conn:
+            for category, rows in batches.items():
+                self._insert_batch(conn, category, rows)
+
+    def import_batch(self, category: str, rows: list):
+        """
+        Store an already-formed batch (keeps its batch_id/created_at).
+        Used by save_trends and by ReplicatedStore to backfill from Supabase.
+        """
+        conn = self._conn()
+        with conn:
+            self._insert_batch(conn, category, rows)
+
+    def _insert_batch(self, conn, category, rows):
+        if not rows:
+            return
+        batch_id = rows[0].get("batch_id") or str(uuid.uuid4())
+        created_at = rows[0]["created_at"]
+
+        # OR IGNORE: re-importing or retrying a batch does not duplicate rows
+        conn.executemany(
+            "INSERT OR IGNORE INTO trends (category, keyword, rank, created_at, batch_id) VALUES (?, ?, ?, ?, ?)",
+            [(category, row["keyword"], row["rank"], row["created_at"], batch_id) for row in rows]
+        )
+        conn.execute(
+            "INSERT INTO trend_batches (category, batch_id, size, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(category) DO UPDATE SET batch_id = excluded.batch_id, size = excluded.size, created_at = excluded.created_at",
+            (category, batch_id, len(rows), created_at)
+        )
+
+    def get_latest_trends(self, category: str):
+        try:
+            cursor = self._conn().execute(
+                "SELECT t.category, t.keyword, t.rank, t.created_at, t.batch_id "
+                "FROM trend_batches b JOIN trends t ON t.batch_id = b.batch_id "
+                "WHERE b.category = ? ORDER BY t.rank",
+                (category,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"[DB] Failed to get latest trends (SQLite): {e}")
+            return []
+
+    def get_latest_batches(self):
+        try:
+            cursor = self._conn().execute(
+                "SELECT t.category, t.keyword, t.rank, t.created_at, t.batch_id "
+                "FROM trend_batches b JOIN trends t ON t.batch_id = b.batch_id "
+                "ORDER BY t.category, t.rank"
+            )
+            batches = {}
+            for row in cursor.fetchall():
+                batches.setdefault(row["category"], []).append(dict(row))
+            return batches
+        except Exception as e:
+            print(f"[DB] Failed to get latest batches (SQLite): {e}")
+            return {}
+
+    def save_analysis(self, keyword: str, reason: str, chart_data: list):
+        try:
+            self.save_analyses([{"keyword": keyword, "reason": reason, "chart_data": chart_data}])
+        except Exception as e:
+            print(f"[DB] Failed to save analysis (SQLite): {e}")
+
+    def save_analyses(self, items: list):
+        """Bulk upsert in one transaction. Raises on failure."""
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO trend_analysis (keyword, reason, chart_data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(keyword) DO UPDATE SET reason = excluded.reason, chart_data = excluded.chart_data, updated_at = excluded.updated_at",
+                [(item["keyword"], item["reason"], json.dumps(item["chart_data"], ensure_ascii=False), now) for item in items]
+            )
+
+    def get_analysis(self, keyword: str):
+        try:
+            row = self._conn().execute(
+                "SELECT keyword, reason, chart_data FROM trend_analysis WHERE keyword = ?",
+                (keyword,)
+            ).fetchone()
+            if not row:
+                return None
+            return {
+                "keyword": row["keyword"],
+                "reason": row["reason"],
+                "chart_data": json.loads(row["chart_data"]) if row["chart_data"] else []
+            }
+        except Exception as e:
+            print(f"[DB] Failed to get analysis (SQLite): {e}")
+            return None
+
+class ReplicatedStore:
+    """
+    Supabase as the source of truth, SQLite as a local write-through replica.
+    Writes go to both; reads are served from local disk and fall through to
+    the primary when a category is missing locally or its batch is older
+    than REPLICA_MAX_AGE (another process may have written Supabase); newer
+    remote batches are then backfilled locally.
+    """
+    def __init__(self, primary, replica: SQLiteStore, max_age: float = None, check_interval: float = None):
+        self.primary = primary
+        self.replica = replica
+        self.max_age = max_age if max_age is not None else REPLICA_MAX_AGE
+        self.check_interval = check_interval if check_interval is not None else REPLICA_CHECK_INTERVAL
+        self._checked_at = {} # {category or None (all): monotonic time of the last primary check}
+        self._pending = {} # {write key: sides still to write} for writes being retried
+
+    def save_trends(self, category: str, trends: list):
+        rows = self.primary.save_trends(category, trends)
+        if rows:
+            # Same batch_id/created_at locally as in Supabase
+            self.replica.import_batch(category, rows)
+            return rows
+        # Primary down: keep serving fresh data from the replica
+        return self.replica.save_trends(category, trends)
+
+    def save_trend_batches(self, batches: dict):
+        key = ("trends",) + tuple(sorted(rows[0]["batch_id"] for rows in batches.values() if rows))
+        self._write_each("save_trend_batches", batches, key)
+
+    def get_latest_trends(self, category: str):
+        local = self.replica.get_latest_trends(category)
+        if local and not self._needs_check(category, {category: local}):
+            return local
+        try:
+            remote = self.primary.get_latest_trends(category)
+        except Exception as e:
+            print(f"[DB] Primary read failed ({e}). Serving local replica.")
+            return local
+        if self._is_newer(remote, local):
+            self.replica.import_batch(category, remote)
+            return remote
+        return local
+
+    def get_latest_batches(self):
+        local = self.replica.get_latest_batches()
+        if local and not self._needs_check(None, local):
+            return local
+        try:
+            remote = self.primary.get_latest_batches()
+        except Exception as e:
+            print(f"[DB] Primary read failed ({e}). Serving local replica.")
+            return local
+        # Merge: categories missing locally or newer in the primary
+        for category, rows in remote.items():
+            if self._is_newer(rows, local.get(category)):
+                self.replica.import_batch(category, rows)
+                local[category] = rows
+        return local
+
+    def _needs_check(self, key, local: dict):
+        """Missing categories or an old batch, and the primary wasn't asked recently."""
+        now = time.monotonic()
+        if now - self._checked_at.get(key, float("-inf")) < self.check_interval:
+            return False
+        expected = [key] if key else Database.CATEGORIES
+        missing = any(not local.get(category) for category in expected)
+        stale = any(rows and self._age(rows) > self.max_age for rows in local.values())
+        if missing or stale:
+            self._checked_at[key] = now
+            return True
+        return False
+
+    @staticmethod
+    def _created_at(rows):
+        return datetime.fromisoformat(rows[0]["created_at"].replace("Z", "+00:00"))
+
+    def _age(self, rows):
+        return (datetime.now(timezone.utc) - self._created_at(rows)).total_seconds()
+
+    def _is_newer(self, remote, local):
+        if not remote:
+            return False
+        if not local:
+            return True
+        return self._created_at(remote) > self._created_at(local)
+
+    def save_analysis(self, keyword: str, reason: str, chart_data: list):
+        self.primary.save_analysis(keyword, reason, chart_data)
+        self.replica.save_analysis(keyword, reason, chart_data)
+
+    def save_analyses(self, items: list):
+        key = ("analyses", hash(tuple((item["keyword"], item["reason"]) for item in items)))
+        self._write_each("save_analyses", items, key)
+
+    def _write_each(self, method: str, payload, key):
+        """
+        Write the replica and the primary independently (replica first, so
+        fresh data is served locally even while Supabase is down). Raises if
+        either side failed; when the caller retries the same payload, only
+        the failed side is written again.
+        """
+        sides = self._pending.pop(key, ("replica", "primary"))
+        failed, error = [], None
+        for side in sides:
+            try:
+                getattr(getattr(self, side), method)(payload)
+            except Exception as e:
+                print(f"[DB] {method} failed on {side}: {e}")
+                failed.append(side)
+                error = error or e
+
+        if failed:
+            self._pending[key] = tuple(failed)
+            while len(self._pending) > 100:
+                # Writes the caller gave up on
+                self._pending.pop(next(iter(self._pending)))
+            raise error
+
+    def get_analysis(self, keyword: str):
+        local = self.replica.get_analysis(keyword)
+        if local:
+            return local
+        remote = self.primary.get_analysis(keyword)
+        if remote:
+            self.replica.save_analysis(keyword, remote["reason"], remote["chart_data"])
+        return remote
@@ -1,38 +1,85 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 import asyncio
+import json
 from contextlib import asynccontextmanager
 
+from backend.database import Database
 from backend.services.collector import TrendCollector
 from backend.services.analyzer import TrendAnalyzer
-from backend.services.naver_datalab import NaverDataLab
+from backend.services.prewarm import AnalysisPrewarmer
+from backend.services.naver_datalab import get_datalab
+from backend.services.collector_lease import CollectorLease
+from backend.services.collector_runtime import CollectorRuntime
+from backend.scrapers.browser_pool import BrowserPool
+from backend.services.http_payload import RenderedPayload, RenderedCache, parse_timestamp
 import os
 
+# "all": API + collector in one process (default)
+# "api": read-only API; a separate collector worker (python -m backend.worker) scrapes
+APP_MODE = os.getenv("APP_MODE", "all")
+
 # Initialize Services
-collector = TrendCollector()
 analyzer = TrendAnalyzer()
-datalab_service = NaverDataLab()
+prewarmer = AnalysisPrewarmer(analyzer)
+datalab_service = get_datalab()
+
+if APP_MODE == "api":
+    collector = TrendCollector()
+    # Never elected: collection triggers are forwarded to the worker
+    collector_lease = CollectorLease()
+    collector.jobs.lease = collector_lease
+    runtime = None
+else:
+    collector = TrendCollector(browser_pool=BrowserPool())
+    # Only one uvicorn worker collects; the others just serve (COLLECTOR_LEASE=0 disables)
+    collector_lease = CollectorLease() if os.getenv("COLLECTOR_LEASE", "1") != "0" else None
+    runtime = CollectorRuntime(collector, collector.browser_pool, lease=collector_lease)
+
+# Chart periods served by /api/trend-data
+PERIOD_DAYS = {"1mo": 30, "3mo": 90, "6mo": 180, "1yr": 365}
 
-# Background Scheduler
-scheduler = AsyncIOScheduler()
+# Pre-encoded response bodies
+rendered_trends = {} # {category: (trends_data, RenderedPayload)}, known categories only
+rendered_charts = RenderedCache(ttl=3600) # {(keyword, period): RenderedPayload}
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("[SYSTEM] Starting Background Scheduler...")
-    scheduler.add_job(collector.collect_all_and_save, 'interval', hours=1)
-    scheduler.start()
-    
-    # Run initial collection in background (fire and forget)
-    asyncio.create_task(collector.collect_all_and_save())
+    print(f"[SYSTEM] Starting in '{APP_MODE}' mode...")
+    collector.writer.start()
+    prewarmer.start()
+    if runtime:
+        await runtime.start()
+    else:
+        await check_collector_worker()
     
     yield
     
     # Shutdown
-    print("[SYSTEM] Shutting down Scheduler...")
-    scheduler.shutdown()
+    if runtime:
+        await runtime.stop()
+    await prewarmer.stop()
+    print("[SYSTEM] Flushing pending DB writes...")
+    await collector.writer.stop()
+    collector.db.close()
+    await datalab_service.close()
+
+async def check_collector_worker():
+    """
+    api mode: the collector worker must share data/ with this process,
+    otherwise its lease is invisible here and nothing ever collects.
+    """
+    leader = await asyncio.to_thread(collector_lease.leader)
+    if leader:
+        print(f"[SYSTEM] Collector worker found: {leader}")
+    else:
+        print(
+            f"[SYSTEM] WARNING: no collector worker holds the lease in {collector_lease.path}. "
+            "Run 'python -m backend.worker' with the same data/ volume, or trends will never refresh."
+        )
 
 app = FastAPI(title="Korea Trend API", description="API for Korea Trend Website", version="1.0.0", lifespan=lifespan)
 
@@ -63,23 +110,56 @@ async def manual_update():
     """
     Manually trigger trend collection (bypasses scheduler).
     Useful if server slept and missed a scheduled job.
+    Returns 202 right away; a run already in flight is joined, not repeated.
+    Followers forward the request to the collector ("throttled" if one was
+    forwarded less than a minute ago).
+    Poll /api/collection-jobs/{job_id} for progress.
     """
     print("[MANUAL] Triggering manual update...")
-    await collector.collect_all_and_save()
-    return {"status": "success", "message": "Trends updated manually"}
+    job, coalesced = collector.start_collection("manual")
+    if job is None:
+        leader = await asyncio.to_thread(collector_lease.leader)
+        if leader is None and APP_MODE == "api":
+            # Nobody would ever pick the request up
+            raise HTTPException(status_code=503, detail=(
+                "No collector worker is running. Start 'python -m backend.worker' "
+                "with the same data/ volume as the API."
+            ))
+        # Another worker holds the collector lease; it picks the request up
+        # (throttled: a request forwarded less than a minute ago is still pending)
+        return JSONResponse(status_code=202, content={
+            "status": "throttled" if coalesced else "forwarded",
+            "job_id": None,
+            "leader": leader
+        })
+    return JSONResponse(status_code=202, content={
+        "status": "accepted",
+        "job_id": job.id,
+        "coalesced": coalesced,
+        "status_url": f"/api/collection-jobs/{job.id}"
+    })
 
-@app.get("/api/trends")
-@app.head("/api/trends")
-async def read_trends(category: str = "all"):
+@app.get("/api/collection-jobs")
+async def list_collection_jobs():
     """
-    Get top trends.
-    Returns cached data if available.
-    Reason is now fetched on-demand via /api/analyze to save costs/time.
+    Recent collection runs, newest first.
+    """
+    return {"running": collector.jobs.current.id if collector.jobs.current else None, "jobs": collector.jobs.recent()}
+
+@app.get("/api/collection-jobs/{job_id}")
+async def get_collection_job(job_id: str):
+    """
+    Status, per-stage progress and timings of one collection run.
+    """
+    job = collector.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job.to_dict()
+
+def build_trends_body(category: str, trends_data: list):
+    """
+    Transform a stored batch into the /api/trends response object.
     """
-    first_source = "shopping" if category != "all" else "all" # optimize source? No, collector handles it.
-    trends_data = await collector.get_trends(source="all", category_filter=category)
-    
-    # Transform to object
     results = []
     
     for idx, item in enumerate(trends_data):
@@ -105,6 +185,56 @@ async def read_trends(category: str = "all"):
         "trends": results
     }
 
+def render_trends(category: str, trends_data: list):
+    """
+    Encode a batch once; reuse the bytes until the collector hands us a new batch.
+    Only known categories are kept, so arbitrary ?category= values can't grow the cache.
+    """
+    cached = rendered_trends.get(category)
+    if cached and cached[0] is trends_data:
+        return cached[1]
+
+    body = build_trends_body(category, trends_data)
+    payload = RenderedPayload(body, last_modified=parse_timestamp(body["last_updated"]))
+    if category in Database.CATEGORIES:
+        rendered_trends[category] = (trends_data, payload)
+    return payload
+
+def prerender_trends(batches: dict):
+    """Collector listener: pre-encode every category right after a collection."""
+    for category, trends_data in batches.items():
+        render_trends(category, trends_data)
+    print(f"[SYSTEM] Pre-rendered {len(batches)} trend payloads.")
+
+collector.listeners.append(prerender_trends)
+# Analyze the top new keywords in the background before users click them
+collector.listeners.append(prewarmer.enqueue)
+
+@app.get("/api/trends")
+@app.head("/api/trends")
+async def read_trends(request: Request, category: str = "all"):
+    """
+    Get top trends.
+    Returns cached data if available (pre-encoded body, ETag/Last-Modified, 304).
+    Reason is now fetched on-demand via /api/analyze to save costs/time.
+    """
+    trends_data = await collector.get_trends(source="all", category_filter=category)
+    return render_trends(category, trends_data).respond(request)
+
+@app.get("/api/stats")
+async def read_stats():
+    """
+    In-process cache counters, DB query and analyzer stage timings (per worker).
+    """
+    return {
+        "trend_cache": collector.cache.stats,
+        "db": collector.db.timings,
+        "writer": collector.writer.stats,
+        "analyzer": {"timings": analyzer.timings, "calls": analyzer.stats},
+        "prewarm": prewarmer.stats,
+        "collector_lease": await asyncio.to_thread(collector_lease.status) if collector_lease else None
+    }
+
 @app.get("/api/analyze/{keyword}")
 async def analyze_trend_api(keyword: str):
     """
@@ -113,21 +243,45 @@ async def analyze_trend_api(keyword: str):
     result = await analyzer.analyze_trend(keyword)
     return result
 
+@app.get("/api/analyze/{keyword}/stream")
+async def analyze_trend_stream_api(keyword: str):
+    """
+    Server-Sent Events version of /api/analyze:
+    `chart` as soon as the chart is known, `reason` text chunks while the LLM
+    writes, then `done` with the same result /api/analyze returns.
+    """
+    async def events():
+        async for event, data in analyzer.analyze_trend_stream(keyword):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # Don't let a proxy buffer the stream
+    })
+
 @app.get("/api/trend-data/{keyword}")
-async def get_trend_data(keyword: str, period: str = "1mo"):
+async def get_trend_data(request: Request, keyword: str, period: str = "1mo"):
     """
     Fetch only the trend chart data for a specific period.
-    period: "1mo" (30 days) or "1yr" (365 days).
+    period: "1mo" (30 days), "3mo", "6mo" or "1yr" (365 days).
+    Shorter periods are sliced from the stored series and re-normalized to 0-100.
+    Variants of a keyword share one chart (see KeywordIndex).
     """
-    from backend.services.naver_datalab import NaverDataLab
-    import asyncio
-    
-    days = 365 if period == "1yr" else 30
+    keyword = analyzer.keywords.canonical(keyword)
+    cached = rendered_charts.get((keyword, period))
+    if cached:
+        return cached.respond(request)
+
+    days = PERIOD_DAYS.get(period, 30)
     
     try:
-        datalab_service = NaverDataLab()
-        chart_data = await asyncio.to_thread(datalab_service.get_daily_trend, keyword, days)
-        return {"keyword": keyword, "period": period, "chart_data": chart_data}
+        chart_data = await datalab_service.get_daily_trend(keyword, days)
     except Exception as e:
         print(f"Error fetching trend data: {e}")
-        return {"keyword": keyword, "period": period, "chart_data": []}
+        chart_data = []
+
+    payload = RenderedPayload({"keyword": keyword, "period": period, "chart_data": chart_data})
+    if chart_data:
+        # Daily series: safe to reuse for an hour
+        rendered_charts.put((keyword, period), payload)
+    return payload.respond(request)
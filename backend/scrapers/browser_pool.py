@@ -0,0 +1,153 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+# Union of the flags both scrapers used to launch with
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox"
+]
+
+class BrowserPool:
+    """
+    One long-lived Chromium shared by all scrapers.
+    Scrapers lease an isolated BrowserContext; `size` bounds how many contexts
+    can be open at once (memory stays flat on a small container).
+    The browser is relaunched automatically if it crashes or disconnects.
+    Owned by CollectorRuntime: started when the process becomes the collector
+    (lease holder), stopped when it loses the lease or shuts down.
+    """
+    def __init__(self, size: int = None, health_interval: float = None, launcher=None):
+        """
+        Args:
+            launcher: async callable returning (playwright, browser); defaults
+                      to launching headless Chromium
+        """
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.health_interval = health_interval or float(os.getenv("BROWSER_HEALTH_INTERVAL", "60"))
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.size)
+        self._health_task = None
+        self._launcher = launcher or self._launch_chromium
+        self.launch_count = 0
+
+    async def start(self):
+        """Launch the browser eagerly and start the health check loop."""
+        await self._ensure_browser()
+        if not self._health_task:
+            self._health_task = asyncio.create_task(self._health_loop())
+        print(f"[BROWSER] Pool started (size={self.size})")
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        async with self._lock:
+            await self._close_browser()
+        print("[BROWSER] Pool stopped.")
+
+    def is_healthy(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    @asynccontextmanager
+    async def context(self, blocker=None, **context_kwargs):
+        """
+        Lease an isolated BrowserContext from the pool.
+        `blocker` (ResourceBlocker) intercepts requests for the whole context.
+        Usage:
+            async with pool.context(user_agent=...) as context:
+                page = await context.new_page()
+        """
+        async with self._slots:
+            browser = await self._ensure_browser()
+            context = await browser.new_context(**context_kwargs)
+            try:
+                if blocker:
+                    await blocker.attach(context)
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"[BROWSER] Failed to close context: {e}")
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self.is_healthy():
+                return self._browser
+
+            if self._browser is not None:
+                print("[BROWSER] Browser disconnected. Relaunching...")
+            await self._close_browser()
+
+            self._playwright, self._browser = await self._launcher()
+            self.launch_count += 1
+            print(f"[BROWSER] Chromium launched (launch #{self.launch_count})")
+            return self._browser
+
+    @staticmethod
+    async def _launch_chromium():
+        playwright = await async_playwright().start()
+        try:
+            browser = await playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        except Exception:
+            await playwright.stop()
+            raise
+        return playwright, browser
+
+    async def _close_browser(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            if not self.is_healthy():
+                try:
+                    await self._ensure_browser()
+                except Exception as e:
+                    print(f"[BROWSER] Health check relaunch failed: {e}")
+
+@asynccontextmanager
+async def lease_context(pool: BrowserPool = None, blocker=None, **context_kwargs):
+    """
+    Lease a context from `pool`, or launch a throwaway browser when no pool is
+    given (standalone scripts like test_scraper_async.py).
+    """
+    try:
+        if pool is not None:
+            async with pool.context(blocker=blocker, **context_kwargs) as context:
+                yield context
+            return
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            try:
+                context = await browser.new_context(**context_kwargs)
+                if blocker:
+                    await blocker.attach(context)
+                yield context
+            finally:
+                await browser.close()
+    finally:
+        if blocker:
+            blocker.report()
@@ -0,0 +1,94 @@
+import asyncio
+import math
+import httpx
+from datetime import datetime, timedelta
+from backend.scrapers.naver_rank import RANK_PAGE_URL, RANK_ENDPOINT, PAGE_SIZE, parse_rank_payload
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+
+class NaverRankHttpClient:
+    """
+    Browserless fast path for the shopping-insight keyword ranking.
+    Loads a category page once for cookies, then POSTs the same form the
+    page's 'Inquiry' button sends for every category and parses the JSON.
+    Pass `transport` (e.g. httpx.MockTransport) to run offline against fixtures.
+    """
+    def __init__(self, timeout: float = 10.0, transport=None, max_concurrency: int = 4):
+        self.timeout = timeout
+        self.transport = transport
+        # Bounds in-flight ranking requests when paging deep into the top 1000
+        self.max_concurrency = max_concurrency
+
+    async def get_category_ranks(self, depths):
+        """
+        Fetch the ranking of several categories over one keep-alive connection.
+        Args:
+            depths: {cid: how many ranks to keep}
+        Returns:
+            dict: {cid: [{"rank": 1, "keyword": "...", "link_id": "..."}, ...]}
+            A category that failed maps to [] so callers can fall back per category.
+        """
+        cids = list(depths)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self.transport,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True
+        ) as client:
+            # Cookie bootstrap once per run (the endpoint rejects requests without a session)
+            await client.get(f"{RANK_PAGE_URL}?cid={cids[0]}")
+
+            results = await asyncio.gather(
+                *(self._fetch_ranks(client, semaphore, cid, depths[cid]) for cid in cids),
+                return_exceptions=True
+            )
+
+        ranks = {}
+        for cid, result in zip(cids, results):
+            if isinstance(result, Exception):
+                print(f"[NaverHTTP] Ranking fetch failed for {cid}: {result}")
+                ranks[cid] = []
+            else:
+                ranks[cid] = result
+        return ranks
+
+    async def _fetch_ranks(self, client, semaphore, cid, depth):
+        pages = math.ceil(depth / PAGE_SIZE)
+        results = await asyncio.gather(
+            *(self._fetch_page(client, semaphore, cid, page) for page in range(1, pages + 1))
+        )
+
+        # Merge pages, de-duplicating by rank
+        merged = {}
+        for page_ranks in results:
+            for item in page_ranks:
+                merged.setdefault(item["rank"], item)
+        return [merged[rank] for rank in sorted(merged)][:depth]
+
+    async def _fetch_page(self, client, semaphore, cid, page):
+        referer = f"{RANK_PAGE_URL}?cid={cid}"
+
+        # DataLab data lags one day; mirror the page's default 1-month window
+        end_date = datetime.now() - timedelta(days=1)
+        start_date = end_date - timedelta(days=30)
+        form = {
+            "cid": cid,
+            "timeUnit": "date",
+            "startDate": start_date.strftime("%Y-%m-%d"),
+            "endDate": end_date.strftime("%Y-%m-%d"),
+            "age": "",
+            "gender": "",
+            "device": "",
+            "page": str(page),
+            "count": str(PAGE_SIZE)
+        }
+        async with semaphore:
+            response = await client.post(
+                RANK_ENDPOINT,
+                data=form,
+                headers={"Referer": referer, "X-Requested-With": "XMLHttpRequest"}
+            )
+        response.raise_for_status()
+        return parse_rank_payload(response.json())
@@ -0,0 +1,75 @@
+# Shared helpers for the DataLab shopping-insight keyword ranking.
+# The ".rank_top1000_list" on sCategory.naver is rendered from this JSON endpoint.
+
+RANK_PAGE_URL = "https://datalab.naver.com/shoppingInsight/sCategory.naver"
+RANK_ENDPOINT = "https://datalab.naver.com/shoppingInsight/getCategoryKeywordRank.naver"
+
+def is_rank_response(response):
+    """Playwright response predicate for the ranking XHR."""
+    return "getCategoryKeywordRank" in response.url and response.status == 200
+
+def parse_rank_payload(payload):
+    """
+    Parse the ranking JSON.
+    Payload: { "ranks": [ { "rank": 1, "keyword": "...", "linkId": "..." }, ... ], ... }
+    Returns:
+        list: [{"rank": 1, "keyword": "...", "link_id": "..."}, ...] sorted by rank
+    """
+    if not isinstance(payload, dict):
+        return []
+
+    ranks = []
+    for item in payload.get("ranks") or []:
+        keyword = (item.get("keyword") or "").strip()
+        if not keyword:
+            continue
+        ranks.append({
+            "rank": int(item.get("rank") or len(ranks) + 1),
+            "keyword": keyword,
+            "link_id": item.get("linkId")
+        })
+
+    ranks.sort(key=lambda x: x["rank"])
+    return ranks
+
+# The ranking list is served 20 per page, up to the top 1000
+PAGE_SIZE = 20
+MAX_DEPTH = 1000
+
+# Bulk DOM extraction: one evaluate call returns every row of the current page.
+# Row text is "<rank>\n<keyword>".
+EXTRACT_RANKS_JS = """
+els => els.map(a => {
+    const lines = a.innerText.split('\\n').map(t => t.trim()).filter(Boolean);
+    const rank = parseInt(lines[0], 10);
+    return {
+        rank: Number.isNaN(rank) ? null : rank,
+        keyword: lines.length > 1 ? lines[1] : (lines[0] || ''),
+        href: a.getAttribute('href')
+    };
+})
+"""
+
+def parse_depth(value, categories, default: int = 10):
+    """
+    Ranking depth per category.
+    Accepts an int (all categories), a dict {"Fashion": 50}, or an env-style
+    string: "20" or "Fashion=50,Food=20".
+    Returns:
+        dict: {"Fashion": 50, "Digital": 10, ...} capped at MAX_DEPTH
+    """
+    depths = {cat: default for cat in categories}
+
+    if isinstance(value, int):
+        depths = {cat: value for cat in categories}
+    elif isinstance(value, dict):
+        depths.update(value)
+    elif isinstance(value, str) and value.strip():
+        for part in value.split(","):
+            if "=" in part:
+                cat, n = part.split("=", 1)
+                depths[cat.strip()] = int(n)
+            else:
+                depths = {cat: int(part) for cat in categories}
+
+    return {cat: max(1, min(int(n), MAX_DEPTH)) for cat, n in depths.items() if cat in categories}
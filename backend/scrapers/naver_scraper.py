@@ -1,98 +1,214 @@
 import asyncio
-from playwright.async_api import async_playwright
+import os
+from backend.scrapers.browser_pool import lease_context
+from backend.scrapers.throttle import HostThrottle
+from backend.scrapers.naver_rank import (
+    RANK_PAGE_URL, EXTRACT_RANKS_JS, is_rank_response, parse_rank_payload, parse_depth
+)
+from backend.scrapers.naver_http import NaverRankHttpClient
+from backend.scrapers.resource_blocker import ResourceBlocker
 
 class NaverShoppingScraper:
+    # Categories: Fashion(50000000), Digital(50000003), Food(50000006), Living(50000008)
+    CATEGORIES = {
+        "50000000": "Fashion",
+        "50000003": "Digital",
+        "50000006": "Food",
+        "50000008": "Living"
+    }
+
+    def __init__(self, pool=None, concurrency: int = None, polite_delay: float = None, http_client=None, depth=None):
+        # Shared BrowserPool (owned by CollectorRuntime). None = launch our own browser.
+        self.pool = pool
+        # Browserless fast path; set NAVER_HTTP_FAST_PATH=0 to always use Playwright
+        if http_client is None and os.getenv("NAVER_HTTP_FAST_PATH", "1") != "0":
+            http_client = NaverRankHttpClient()
+        self.http_client = http_client
+        # Max category pages open at once inside the context
+        self.concurrency = concurrency or int(os.getenv("NAVER_SCRAPE_CONCURRENCY", "4"))
+        # Min seconds between page loads against the same host
+        if polite_delay is None:
+            polite_delay = float(os.getenv("NAVER_POLITE_DELAY", "1.0"))
+        self.throttle = HostThrottle(polite_delay)
+        # Ranks kept per category (default top 10, up to the full top 1000)
+        if depth is None:
+            depth = os.getenv("NAVER_RANK_DEPTH", "10")
+        self.depth = parse_depth(depth, list(self.CATEGORIES.values()))
+
     async def get_trends(self):
-        # Categories: Fashion(50000000), Digital(50000003), Food(50000006), Living(50000008)
-        categories = {
-            "50000000": "Fashion",
-            "50000003": "Digital",
-            "50000006": "Food",
-            "50000008": "Living"
-        }
+        # 1. Fast path: plain HTTP, no Chromium
+        fast_results = {}
+        if self.http_client:
+            try:
+                fast_results = await self.http_client.get_category_ranks(
+                    {cid: self.depth[cat] for cid, cat in self.CATEGORIES.items()}
+                )
+            except Exception as e:
+                print(f"[NaverHTTP] Fast path failed: {e}")
+
+        fast_trends = {}
+        for cid, ranks in fast_results.items():
+            if ranks:
+                cat_name = self.CATEGORIES[cid]
+                fast_trends[cid] = [
+                    {"keyword": item["keyword"], "category": cat_name, "rank": item["rank"]}
+                    for item in ranks[:self.depth[cat_name]]
+                ]
+
+        # 2. Playwright only for categories the fast path could not serve
+        missing = {cid: cat for cid, cat in self.CATEGORIES.items() if cid not in fast_trends}
+        browser_trends = {}
+        if missing:
+            print(f"Falling back to Playwright for: {', '.join(missing.values())}")
+            browser_trends = await self._scrape_with_browser(missing)
+        else:
+            print("Naver rankings served by HTTP fast path (no browser).")
+
+        # Keep category order stable
         all_trends = []
-        
+        for cid in self.CATEGORIES:
+            all_trends.extend(fast_trends.get(cid) or browser_trends.get(cid) or [])
+        return all_trends
+
+    async def _scrape_with_browser(self, categories):
+        """
+        Playwright flow for the given {cid: cat_name}.
+        Returns:
+            dict: {cid: [{"keyword": "...", "category": "...", "rank": 1}, ...]}
+        """
+        browser_trends = {}
+
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        "--disable-blink-features=AutomationControlled",
-                        "--no-sandbox", 
-                        "--disable-setuid-sandbox"
-                    ]
-                )
-                
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080}
+            # Keep stylesheets so the submit button is laid out and clickable
+            blocker = ResourceBlocker("NaverShopping", allow_types=["stylesheet"])
+            async with lease_context(
+                self.pool,
+                blocker=blocker,
+                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+                viewport={"width": 1920, "height": 1080}
+            ) as context:
+                # Scrape categories in parallel pages (bounded), so a full
+                # cycle takes about as long as the slowest category.
+                semaphore = asyncio.Semaphore(self.concurrency)
+
+                async def bounded(cid, cat_name):
+                    async with semaphore:
+                        return await self._scrape_category(context, cid, cat_name)
+
+                results = await asyncio.gather(
+                    *(bounded(cid, cat_name) for cid, cat_name in categories.items())
                 )
-                
-                # Scrape first 2 categories to save time, or round-robin? 
-                # Let's do all 4 but limit items per category to keep it fast
-                for cid, cat_name in categories.items():
-                    target_url = f"https://datalab.naver.com/shoppingInsight/sCategory.naver?cid={cid}"
-                    print(f"Scraping Naver {cat_name} Category ({cid})...")
-                    
-                    try:
-                        page = await context.new_page()
-                        await page.goto(target_url, wait_until="domcontentloaded", timeout=20000)
-                        
-                        # FORCE CLICK 'Inquiry' button to ensure data loads for this CID
-                        try:
-                            # Wait for button then click
-                            await asyncio.sleep(2) # Stabilize
-                            await page.wait_for_selector(".btn_submit", timeout=5000)
-                            await page.click(".btn_submit")
-                            try:
-                                await page.wait_for_load_state("networkidle", timeout=5000)
-                            except:
-                                pass
-                            await asyncio.sleep(3) # Wait for AJAX reload
-                        except Exception as e:
-                            print(f"Warning: Could not click submit button: {e}")
-
-                        # Wait for list (fast timeout since we expect it)
-                        try:
-                            # increased timeout to 15s
-                            await page.wait_for_selector(".rank_top1000_list li a", timeout=15000)
-                        except:
-                            # Fallback: click simple submit if needed, or just skip
-                            print(f"Timeout waiting for {cat_name} list. Retrying click...")
-                            try:
-                                await page.click(".btn_submit")
-                                await asyncio.sleep(3)
-                                await page.wait_for_selector(".rank_top1000_list li a", timeout=10000)
-                            except Exception as e2:
-                                print(f"Retry failed for {cat_name}: {e2}")
-                        
-                        items = await page.query_selector_all(".rank_top1000_list li a")
-                        print(f"Found {len(items)} items for {cat_name}")
-                        
-                        count = 0
-                        for item in items: 
-                            if count >= 10:  # Top 10 per category
-                                break
-                            
-                            full_text = await item.inner_text()
-                            parts = full_text.split('\n')
-                            keyword = parts[1].strip() if len(parts) > 1 else full_text.strip()
-                            all_trends.append({"keyword": keyword, "category": cat_name})
-                            count += 1
-                            
-                        await page.close()
-                        await asyncio.sleep(1) # Polite delay
-                        
-                    except Exception as e:
-                        print(f"Error scraping Naver {cat_name}: {e}")
-                
-                await browser.close()
-                
+                browser_trends = dict(zip(categories, results))
+
         except Exception as e:
             print(f"Playwright error: {e}")
-            
-        # Shuffle or just return logic? 
-        return all_trends
+
+        return browser_trends
+
+    async def _scrape_category(self, context, cid, cat_name):
+        """
+        Scrape the top N keywords of one category in its own page.
+        Primary path: capture the ranking XHR triggered by the submit button
+        and parse its JSON. DOM scraping is only a fallback.
+        Returns:
+            list: [{"keyword": "...", "category": "Fashion", "rank": 1}, ...]
+        """
+        target_url = f"{RANK_PAGE_URL}?cid={cid}"
+        depth = self.depth[cat_name]
+        ranks = []
+        page = None
+
+        try:
+            await self.throttle.wait(target_url)
+            print(f"Scraping Naver {cat_name} Category ({cid})...")
+
+            page = await context.new_page()
+            await page.goto(target_url, wait_until="domcontentloaded", timeout=20000)
+
+            # 1. Response-driven: click 'Inquiry' and read the JSON behind the list
+            try:
+                ranks = await self._fetch_via_response(page, depth)
+                print(f"Found {len(ranks)} items for {cat_name} (XHR)")
+            except Exception as e:
+                print(f"Warning: Ranking XHR not captured for {cat_name}: {e}")
+
+            # 2. Fallback: DOM scraping
+            if not ranks:
+                ranks = await self._fetch_via_dom(page, cat_name, depth)
+                print(f"Found {len(ranks)} items for {cat_name} (DOM)")
+
+        except Exception as e:
+            print(f"Error scraping Naver {cat_name}: {e}")
+        finally:
+            if page:
+                await page.close()
+
+        return [{"keyword": item["keyword"], "category": cat_name, "rank": item["rank"]} for item in ranks[:depth]]
+
+    async def _fetch_via_response(self, page, depth):
+        # FORCE CLICK 'Inquiry' button to ensure data loads for this CID
+        async with page.expect_response(is_rank_response, timeout=15000) as response_info:
+            await page.wait_for_selector(".btn_submit", timeout=5000)
+            await page.click(".btn_submit")
+
+        response = await response_info.value
+        ranks = parse_rank_payload(await response.json())
+
+        # Page through the top 1000 until we have enough
+        while ranks and len(ranks) < depth:
+            next_button = await page.query_selector(".btn_page_next")
+            if not next_button:
+                break
+            async with page.expect_response(is_rank_response, timeout=10000) as response_info:
+                await next_button.click()
+            response = await response_info.value
+            page_ranks = parse_rank_payload(await response.json())
+            if not page_ranks:
+                break
+            ranks.extend(page_ranks)
+
+        return ranks[:depth]
+
+    async def _fetch_via_dom(self, page, cat_name, depth):
+        # Wait for list; retry the click once if it never renders
+        try:
+            await page.wait_for_selector(".rank_top1000_list li a", timeout=10000)
+        except:
+            print(f"Timeout waiting for {cat_name} list. Retrying click...")
+            try:
+                await page.click(".btn_submit")
+                await page.wait_for_selector(".rank_top1000_list li a", timeout=10000)
+            except Exception as e2:
+                print(f"Retry failed for {cat_name}: {e2}")
+
+        ranks = []
+        while len(ranks) < depth:
+            # One round-trip for the whole page of rows
+            rows = await page.eval_on_selector_all(".rank_top1000_list li a", EXTRACT_RANKS_JS)
+            rows = [row for row in rows if row["keyword"]]
+            if not rows:
+                break
+            for row in rows:
+                if row["rank"] is None:
+                    row["rank"] = len(ranks) + 1
+                ranks.append(row)
+
+            next_button = await page.query_selector(".btn_page_next")
+            if len(ranks) >= depth or not next_button:
+                break
+            await next_button.click()
+            try:
+                # Wait until the list shows the next page
+                await page.wait_for_function(
+                    "rank => { const a = document.querySelector('.rank_top1000_list li a'); return a && parseInt(a.innerText, 10) > rank; }",
+                    arg=rows[0]["rank"],
+                    timeout=10000
+                )
+            except Exception as e:
+                print(f"Paging stopped for {cat_name}: {e}")
+                break
+
+        return ranks[:depth]
 
 if __name__ == "__main__":
     scraper = NaverShoppingScraper()
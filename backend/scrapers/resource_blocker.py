@@ -0,0 +1,80 @@
+import os
+from urllib.parse import urlparse
+
+# We only read text from the pages, so heavy assets are pure overhead
+DEFAULT_BLOCKED_TYPES = {"image", "font", "media", "stylesheet"}
+
+DEFAULT_BLOCKED_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "scorecardresearch.com",
+    "wcs.naver.net",
+    "lcs.naver.com",
+    "nlog.naver.com"
+}
+
+# Aborted requests are never downloaded, so "bytes saved" is an estimate
+# from typical asset sizes per resource type.
+ESTIMATED_BYTES = {
+    "image": 40_000,
+    "font": 60_000,
+    "media": 500_000,
+    "stylesheet": 30_000,
+    "script": 50_000,
+    "xhr": 5_000,
+    "fetch": 5_000
+}
+
+class ResourceBlocker:
+    """
+    Request interception for a BrowserContext.
+    Aborts images, fonts, media, stylesheets and analytics/ad domains by default;
+    each scraper can allowlist resource types or domains it actually needs.
+    """
+    def __init__(self, name: str = "scraper", allow_types=None, allow_domains=None,
+                 blocked_types=None, blocked_domains=None):
+        self.name = name
+        self.enabled = os.getenv("SCRAPER_BLOCK_RESOURCES", "1") != "0"
+        self.blocked_types = set(blocked_types or DEFAULT_BLOCKED_TYPES) - set(allow_types or [])
+        self.blocked_domains = set(blocked_domains or DEFAULT_BLOCKED_DOMAINS)
+        self.allow_domains = set(allow_domains or [])
+        self.stats = {"allowed": 0, "blocked": 0, "bytes_saved": 0, "by_type": {}}
+
+    async def attach(self, context):
+        if self.enabled:
+            await context.route("**/*", self._handle)
+
+    def should_block(self, url: str, resource_type: str):
+        host = urlparse(url).hostname or ""
+        if self._matches(host, self.allow_domains):
+            return False
+        if self._matches(host, self.blocked_domains):
+            return True
+        return resource_type in self.blocked_types
+
+    async def _handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats["blocked"] += 1
+            self.stats["bytes_saved"] += ESTIMATED_BYTES.get(request.resource_type, 10_000)
+            self.stats["by_type"][request.resource_type] = self.stats["by_type"].get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            self.stats["allowed"] += 1
+            await route.continue_()
+
+    def report(self):
+        if not self.enabled:
+            return
+        print(
+            f"[BLOCKER] {self.name}: blocked {self.stats['blocked']} / allowed {self.stats['allowed']} requests, "
+            f"~{self.stats['bytes_saved'] / 1024:.0f} KB saved {self.stats['by_type']}"
+        )
+
+    @staticmethod
+    def _matches(host, domains):
+        return any(host == d or host.endswith("." + d) for d in domains)
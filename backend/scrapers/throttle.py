@@ -0,0 +1,22 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+class HostThrottle:
+    """
+    Politeness delay per host: requests to the same host start at least
+    `delay` seconds apart, even when pages are scraped concurrently.
+    """
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self._locks = {}
+        self._last_start = {}
+
+    async def wait(self, url: str):
+        host = urlparse(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            elapsed = time.monotonic() - self._last_start.get(host, 0.0)
+            if elapsed < self.delay:
+                await asyncio.sleep(self.delay - elapsed)
+            self._last_start[host] = time.monotonic()
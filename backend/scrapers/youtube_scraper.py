@@ -1,24 +1,29 @@
 import asyncio
-from playwright.async_api import async_playwright
+import os
+from backend.scrapers.browser_pool import lease_context
+from backend.scrapers.resource_blocker import ResourceBlocker
 
 class YoutubeScraper:
+    def __init__(self, pool=None, depth: int = None):
+        # Shared BrowserPool (owned by CollectorRuntime). None = launch our own browser.
+        self.pool = pool
+        # Number of trending titles to keep
+        self.depth = depth or int(os.getenv("YOUTUBE_RANK_DEPTH", "10"))
+
     async def get_trends(self):
         url = "https://www.youtube.com/feed/trending"
         trends = []
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=["--disable-blink-features=AutomationControlled"]
-                )
-                
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
-                    locale="ko-KR", 
-                    timezone_id="Asia/Seoul"
-                )
-                
+            # Only '#video-title' text is read: thumbnails/avatars/video are wasted bytes
+            blocker = ResourceBlocker("YouTube")
+            async with lease_context(
+                self.pool,
+                blocker=blocker,
+                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+                locale="ko-KR", 
+                timezone_id="Asia/Seoul"
+            ) as context:
                 page = await context.new_page()
                 print(f"Navigating to {url}...")
                 
@@ -32,22 +37,22 @@ class YoutubeScraper:
                     except:
                         pass
                         
-                    titles = await page.query_selector_all("#video-title")
+                    # One round-trip for every title on the page
+                    videos = await page.eval_on_selector_all(
+                        "#video-title",
+                        "els => els.map(e => ({title: (e.textContent || '').trim(), href: e.closest('a') ? e.closest('a').href : null}))"
+                    )
                     
-                    count = 0
-                    for title in titles:
-                        if count >= 10:
+                    for video in videos:
+                        if len(trends) >= self.depth:
                             break
-                        
-                        text = await title.inner_text()
-                        if text:
-                            trends.append(text.strip())
-                            count += 1
+                        if video["title"]:
+                            trends.append(video["title"])
                             
                 except Exception as e:
                     print(f"Error scraping YouTube: {e}")
-                
-                await browser.close()
+                finally:
+                    await page.close()
                 
         except Exception as e:
             print(f"Playwright error: {e}")
@@ -1,13 +1,99 @@
 import os
 import asyncio
 import json
+import re
+import time
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
-from backend.database import Database
+from backend.database import get_database
+from backend.services.write_queue import get_write_queue
+from backend.services.naver_datalab import get_datalab
+from backend.services.keywords import get_keyword_index
 
 # Load env to get OPENAI_API_KEY
 load_dotenv()
 
+# Post-processing: Remove Markdown formatting (links, bold) and citations
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)') # [text](url) -> text
+URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+') # bare URLs
+CITATION_RE = re.compile(r'\([a-zA-Z0-9.-]+\.[a-z]{2,}\)') # (news.nate.com), (www.naver.com)
+BOLD_STAR_RE = re.compile(r'\*\*([^*]+)\*\*') # **text** -> text
+BOLD_UNDERSCORE_RE = re.compile(r'__([^_]+)__') # __text__ -> text
+URL_START_RE = re.compile(r'https?:/?/?') # "http:", "https:/", "https://..."
+
+def clean_reason(content: str):
+    content = LINK_RE.sub(r'\1', content)
+    content = URL_RE.sub('', content)
+    content = CITATION_RE.sub('', content)
+    content = BOLD_STAR_RE.sub(r'\1', content)
+    content = BOLD_UNDERSCORE_RE.sub(r'\1', content)
+    return content
+
+class ReasonCleaner:
+    """
+    Applies clean_reason to a token stream.
+    Text is only released once no link, bold, citation or URL can still be
+    open in it; the held-back tail is released by finish(), whose result
+    equals clean_reason(full text).
+    """
+    def __init__(self):
+        self.raw = ""
+        self.emitted = ""
+
+    def feed(self, delta: str):
+        """Returns: str, cleaned text that is safe to show now (may be empty)."""
+        self.raw += delta
+        return self._emit(clean_reason(self.raw[:self._safe_cut()]))
+
+    def finish(self):
+        """Returns: str, the remaining cleaned text."""
+        return self._emit(clean_reason(self.raw))
+
+    def _emit(self, cleaned):
+        if not cleaned.startswith(self.emitted):
+            # Shown text can't be taken back: keep streaming from the same
+            # length rather than going silent ("done" carries the exact text)
+            print("[ANALYZER] Streamed reason diverged from the cleaned text")
+        delta = cleaned[len(self.emitted):]
+        self.emitted = cleaned if len(cleaned) > len(self.emitted) else self.emitted
+        return delta
+
+    def _safe_cut(self):
+        # Cutting can expose another open construct: repeat until stable
+        cut = len(self.raw)
+        while True:
+            new_cut = self._open_construct_start(self.raw[:cut])
+            if new_cut == cut:
+                return cut
+            cut = new_cut
+
+    @staticmethod
+    def _open_construct_start(raw):
+        cuts = [len(raw)]
+        # [text] possibly followed by (url)
+        bracket = raw.rfind('[')
+        if bracket != -1:
+            tail = raw[bracket:]
+            if ']' not in tail or tail.endswith(']') or ('](' in tail and ')' not in tail[tail.index(']('):]):
+                cuts.append(bracket)
+        # Unclosed (citation) or (url)
+        paren = raw.rfind('(')
+        if paren != -1 and ')' not in raw[paren:]:
+            cuts.append(paren)
+        # Unclosed bold, or a marker that may be half-written
+        for marker in ('**', '__'):
+            if raw.count(marker) % 2:
+                cuts.append(raw.rfind(marker))
+        cuts.append(len(raw.rstrip('*_')))
+        # A URL that may still be growing, also glued to text ("출처:https://...")
+        token = re.search(r'\S*$', raw)
+        for h in re.finditer('h', token.group()):
+            rest = token.group()[h.start():]
+            if URL_START_RE.match(rest) or 'https://'.startswith(rest) or 'http://'.startswith(rest):
+                cuts.append(token.start() + h.start())
+                break
+        return min(cuts)
+
 class TrendAnalyzer:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -17,49 +103,150 @@ class TrendAnalyzer:
             self.client = None
             print("[WARNING] No OPENAI_API_KEY found. Analyzer will return mock data.")
             
-        # Database
-        self.db = Database()
+        # Database (shared async client) + write-behind queue for saves
+        self.db = get_database()
+        self.writer = get_write_queue()
+        # Shared DataLab client (pooled connection)
+        self.datalab = get_datalab()
+        # Variants of a keyword share one stored analysis and chart
+        self.keywords = get_keyword_index()
+        # How long a cache hit waits for fresh chart data before using the stored one
+        self.chart_wait = float(os.getenv("ANALYZE_CHART_WAIT", "0.3"))
+        # Per-stage latency: {stage: {"count", "total_ms", "max_ms"}}
+        self.timings = {}
+        # Single-flight: one in-flight analysis per keyword, shared by concurrent callers
+        self._inflight = {}
+        # Streams of in-flight analyses: events so far (replayed to late
+        # joiners) and the queues of streaming callers, per keyword
+        self._progress = {}
+        self._subscribers = {}
+        self.stats = {"calls": 0, "coalesced": 0}
 
     async def analyze_trend(self, keyword: str):
         """
         Analyze trend using OpenAI's Native Web Search (Implicit) + Naver Datalab Data.
+        Concurrent calls for the same keyword (or a variant of it) await one
+        shared analysis (one DataLab fetch, at most one LLM call).
         Returns:
             dict: { "keyword": str, "reason": str, "chart_data": list }
         """
+        task = self._join_or_start(self.keywords.canonical(keyword))
+        # Shield so a disconnecting client does not cancel the shared analysis
+        result = await asyncio.shield(task)
+        return {**result, "keyword": keyword}
+
+    async def analyze_trend_stream(self, keyword: str):
+        """
+        Streaming variant of analyze_trend. Yields (event, data):
+        - ("chart", chart_data) as soon as the chart is known
+        - ("reason", text) cleaned reason text as the LLM writes it
+        - ("done", result) the same dict analyze_trend returns (and stores)
+        Joining an analysis already in flight (streamed or not) first replays
+        what it emitted so far, then follows it live.
+        """
+        canonical = self.keywords.canonical(keyword)
+        task = self._join_or_start(canonical)
+        events = self._subscribe(canonical)
+        getter = None
+        try:
+            while not task.done():
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+                getter = None
+            while not events.empty():
+                yield events.get_nowait()
+
+            result = await asyncio.shield(task)
+            yield "done", {**result, "keyword": keyword}
+        finally:
+            # Client gone (or done): drop the pending get and the subscription
+            if getter is not None:
+                getter.cancel()
+            self._unsubscribe(canonical, events)
+
+    def _join_or_start(self, keyword: str):
+        """Single-flight: the in-flight analysis for (canonical) keyword, or a new one."""
+        self.stats["calls"] += 1
+        task = self._inflight.get(keyword)
+        if task is None:
+            self._progress[keyword] = []
+            task = asyncio.create_task(self._analyze(keyword, lambda event, data: self._publish(keyword, event, data)))
+            self._inflight[keyword] = task
+            task.add_done_callback(lambda done: self._finish_flight(keyword, done))
+        else:
+            self.stats["coalesced"] += 1
+            print(f"[ANALYZER] Joining in-flight analysis for '{keyword}'")
+        return task
+
+    def _finish_flight(self, keyword: str, task):
+        if self._inflight.get(keyword) is task:
+            self._inflight.pop(keyword, None)
+            self._progress.pop(keyword, None)
+
+    def _subscribe(self, keyword: str):
+        queue = asyncio.Queue()
+        for event in self._progress.get(keyword, []):
+            queue.put_nowait(event)
+        self._subscribers.setdefault(keyword, []).append(queue)
+        return queue
+
+    def _unsubscribe(self, keyword: str, queue):
+        queues = self._subscribers.get(keyword, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(keyword, None)
+
+    def _publish(self, keyword: str, event: str, data):
+        """Record an event of the in-flight analysis and fan it out to its streams."""
+        if keyword in self._progress:
+            self._progress[keyword].append((event, data))
+        for queue in self._subscribers.get(keyword, []):
+            queue.put_nowait((event, data))
+
+    async def _analyze(self, keyword: str, emit=None):
+        """
+        Args:
+            emit: optional callback(event, data) receiving "chart" and the
+                  streamed "reason" deltas. The LLM answer is always streamed,
+                  so a streaming caller can join any analysis in flight.
+        """
+        emit = emit or (lambda event, data: None)
         if not self.client:
             return self._get_mock_analysis(keyword)
 
-        # 1. Fetch Naver Datalab Data (Async wrap)
-        from backend.services.naver_datalab import NaverDataLab
-        try:
-            datalab_service = NaverDataLab()
-            chart_data = await asyncio.to_thread(datalab_service.get_daily_trend, keyword, days=365)
-            
-            # Create a summary for LLM context
-            if chart_data:
-                peak = max(chart_data, key=lambda x: x['ratio'])
-                recent = chart_data[-1] if chart_data else None
-                data_context = f"네이버 검색량 추이 (1년): {chart_data[0]['date']}~{chart_data[-1]['date']}. 최고점: {peak['date']} ({peak['ratio']}). 최근: {recent['date']} ({recent['ratio']})."
-            else:
-                data_context = "네이버 검색량 데이터 없음."
-        except Exception as e:
-            print(f"Naver DataLab Error: {e}")
-            chart_data = []
-            data_context = "네이버 검색량 데이터 조회 실패."
+        # 1. Chart fetch and cache lookup run concurrently
+        chart_task = asyncio.create_task(self._timed("chart", self.datalab.get_daily_trend(keyword, days=365)))
+        cached_analysis = self.writer.peek_analysis(keyword) or await self._timed("cache_lookup", self.db.get_analysis(keyword))
 
-        # 2. Check Database for Cached Reason
-        cached_analysis = self.db.get_analysis(keyword)
+        # 2. Cache hit: answer now, don't wait on DataLab
         if cached_analysis:
             print(f"[DB HIT] Returning stored analysis for '{keyword}'")
+            chart_data = await self._chart_for_cached(chart_task, cached_analysis)
+            emit("chart", chart_data)
             return {
                 "keyword": keyword,
                 "reason": cached_analysis["reason"],
-                "chart_data": chart_data # Always return fresh chart data + cached reason
+                "chart_data": chart_data
             }
 
+        # 3. Cache miss: the LLM needs the chart as context
+        try:
+            chart_data = await chart_task
+            data_context = self._build_data_context(chart_data)
+        except Exception as e:
+            print(f"Naver DataLab Error: {e}")
+            chart_data = []
+            data_context = "네이버 검색량 데이터 조회 실패."
+        emit("chart", chart_data)
+
         print(f"Analyzing trend for: {keyword} (LLM Call)...")
         
-        # 3. LLM Analysis
+        # 4. LLM Analysis
         system_prompt = """
         너는 한국의 최신 트렌드를 심층 분석하는 전문가야.
         **웹 검색 기능**을 사용하여 이 키워드가 **왜** 유행하는지 정확한 '유래'와 '이유'를 찾아내.
@@ -95,33 +282,17 @@ class TrendAnalyzer:
         {data_context}
         """
         
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
         try:
             # Native Web Search - Implicit (JSON mode not supported with search)
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini-search-preview", 
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Post-processing: Remove Markdown formatting (links, bold)
-            import re
-            # Remove links [text](url) -> text
-            content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)
-            # Remove bare URLs
-            content = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', content)
-            # Remove domain citations like (news.nate.com) or (www.naver.com)
-            content = re.sub(r'\([a-zA-Z0-9.-]+\.[a-z]{2,}\)', '', content)
-            # Remove bold **text** -> text
-            content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)
-            # Remove bold __text__ -> text
-            content = re.sub(r'__([^_]+)__', r'\1', content)
+            content = await self._timed("llm", self._stream_completion(messages, emit))
             
-            # Save to DB
-            self.db.save_analysis(keyword, content, chart_data)
+            # Save to DB (write-behind, the response does not wait for it)
+            self.writer.enqueue_analysis(keyword, content, chart_data)
             
             return {
                 "keyword": keyword,
@@ -133,6 +304,68 @@ class TrendAnalyzer:
             print(f"LLM/Search error: {e}")
             return self._get_mock_analysis(keyword)
 
+    async def _stream_completion(self, messages, emit):
+        """
+        Stream the completion, emitting cleaned "reason" deltas.
+        Returns:
+            str: the full cleaned reason (same as the non-streaming path)
+        """
+        start = time.perf_counter()
+        stream = await self.client.chat.completions.create(
+            model="gpt-4o-mini-search-preview",
+            messages=messages,
+            stream=True
+        )
+        cleaner = ReasonCleaner()
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if not cleaner.raw:
+                self._record("llm_first_token", (time.perf_counter() - start) * 1000)
+            text = cleaner.feed(delta)
+            if text:
+                emit("reason", text)
+
+        text = cleaner.finish()
+        if text:
+            emit("reason", text)
+        return clean_reason(cleaner.raw)
+
+    async def _chart_for_cached(self, chart_task, cached_analysis):
+        """
+        Fresh chart data if DataLab answers within chart_wait (usually instant,
+        served from the local series store), else the chart stored with the
+        analysis. A slow fetch keeps running and warms the store for next time.
+        """
+        done, _ = await asyncio.wait({chart_task}, timeout=self.chart_wait)
+        if chart_task in done and not chart_task.exception() and chart_task.result():
+            return chart_task.result()
+        return cached_analysis.get("chart_data") or []
+
+    @staticmethod
+    def _build_data_context(chart_data):
+        # Summary of the chart for the LLM prompt
+        if not chart_data:
+            return "네이버 검색량 데이터 없음."
+        peak = max(chart_data, key=lambda x: x['ratio'])
+        recent = chart_data[-1]
+        return f"네이버 검색량 추이 (1년): {chart_data[0]['date']}~{chart_data[-1]['date']}. 최고점: {peak['date']} ({peak['ratio']}). 최근: {recent['date']} ({recent['ratio']})."
+
+    async def _timed(self, stage: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._record(stage, (time.perf_counter() - start) * 1000)
+
+    def _record(self, stage: str, elapsed_ms: float):
+        stats = self.timings.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] = round(stats["total_ms"] + elapsed_ms, 1)
+        stats["max_ms"] = round(max(stats["max_ms"], elapsed_ms), 1)
+        print(f"[ANALYZER] {stage} took {elapsed_ms:.0f}ms")
+
     def _get_mock_analysis(self, keyword):
         return {
             "keyword": keyword,
@@ -0,0 +1,163 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+class CollectionJob:
+    """
+    One collection run: who asked for it and how far it got.
+    Stages are recorded as they start, so a running job shows its progress.
+    """
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.triggers = [trigger]
+        self.status = "running"
+        self.created_at = _now_iso()
+        self.finished_at = None
+        self.error = None
+        self.stages = []
+        self._started = time.perf_counter()
+        self._duration_ms = None
+        self.task = None
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = {"name": name, "status": "running", "started_at": _now_iso(), "duration_ms": None}
+        self.stages.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+            entry["status"] = "done"
+        except BaseException:
+            entry["status"] = "failed"
+            raise
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            print(f"[JOB {self.id}] {name} took {entry['duration_ms']:.0f}ms")
+
+    def finish(self, error: Exception = None):
+        self.status = "failed" if error else "succeeded"
+        self.error = str(error) if error else None
+        self.finished_at = _now_iso()
+        self._duration_ms = round((time.perf_counter() - self._started) * 1000, 1)
+
+    def to_dict(self):
+        running = [stage["name"] for stage in self.stages if stage["status"] == "running"]
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "triggers": self.triggers,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self._duration_ms if self._duration_ms is not None else round((time.perf_counter() - self._started) * 1000, 1),
+            "current_stage": running[-1] if running else None,
+            "stages": self.stages,
+            "error": self.error
+        }
+
+class CollectionCoordinator:
+    """
+    Guarantees at most one collection run in flight.
+    Every trigger (scheduler, startup, staleness check, manual) goes through
+    trigger(); while a run is in flight, new triggers join it instead of
+    starting another one. Recent jobs are kept for the status endpoint.
+    With a `lease` (CollectorLease), only the lease holder collects; other
+    processes forward their triggers to it.
+    """
+    def __init__(self, run, history: int = 20, lease=None):
+        """
+        Args:
+            run: async callable(job) doing the actual collection
+        """
+        self._run = run
+        self.lease = lease
+        self.current = None
+        self._jobs = deque(maxlen=history)
+
+    @property
+    def is_running(self):
+        return self.current is not None
+
+    def trigger(self, trigger: str):
+        """
+        Start a run, or join the one in flight.
+        Returns:
+            tuple: (CollectionJob, coalesced: bool); job is None when another
+                   process holds the collector lease (coalesced: the request
+                   was throttled, one was forwarded less than a minute ago)
+        """
+        if self.lease is not None and not self.lease.is_leader:
+            forwarded = self.lease.request_run(trigger)
+            return None, not forwarded
+
+        if self.current:
+            self.current.triggers.append(trigger)
+            print(f"[JOBS] '{trigger}' joined in-flight collection {self.current.id}")
+            return self.current, True
+
+        job = CollectionJob(trigger)
+        # Raises without a running loop (e.g. called from a thread): register
+        # the job only once its task exists, so a failed start can't wedge us
+        execute = self._execute(job)
+        try:
+            job.task = asyncio.create_task(execute)
+        except RuntimeError:
+            execute.close()
+            raise
+        job.task.add_done_callback(lambda _: self._release(job))
+        self.current = job
+        self._jobs.append(job)
+        print(f"[JOBS] Collection {job.id} started ({trigger})")
+        return job, False
+
+    async def scheduled(self, trigger: str = "scheduled"):
+        """
+        Scheduler entry point. APScheduler's AsyncIOExecutor runs plain
+        functions in a thread pool, where there is no event loop; a coroutine
+        job runs on the loop.
+        """
+        self.trigger(trigger)
+
+    async def run(self, trigger: str):
+        """Trigger and wait for the (possibly shared) run to finish."""
+        job, _ = self.trigger(trigger)
+        if job is None:
+            return None
+        # Shield: a cancelled waiter must not cancel the shared run
+        await asyncio.shield(job.task)
+        return job
+
+    def get(self, job_id: str):
+        for job in self._jobs:
+            if job.id == job_id:
+                return job
+        return None
+
+    def recent(self):
+        return [job.to_dict() for job in reversed(self._jobs)]
+
+    def _release(self, job):
+        # Also covers a task cancelled before it started (_execute never ran)
+        if job.status == "running":
+            job.finish(RuntimeError("cancelled"))
+        if self.current is job:
+            self.current = None
+
+    async def _execute(self, job):
+        try:
+            await self._run(job)
+            job.finish()
+        except asyncio.CancelledError:
+            job.finish(RuntimeError("cancelled (shutdown)"))
+            raise
+        except Exception as e:
+            print(f"[BACKGROUND] Error during collection: {e}")
+            job.finish(e)
+        finally:
+            self.current = None
+            print(f"[JOBS] Collection {job.id} {job.status}.")
@@ -1,152 +1,262 @@
+import os
 from datetime import datetime
-from backend.database import Database
+from backend.database import get_database
+from backend.services.trend_cache import TrendCache
+from backend.services.write_queue import get_write_queue
+from backend.services.naver_datalab import get_datalab
+from backend.services.keywords import get_keyword_index
+from backend.services.collection_jobs import CollectionCoordinator
+from backend.services.http_payload import parse_timestamp
 
 # Naver API credentials should be loaded from env or passed in
 # For now, we will structure the class to accept them
 
 class TrendCollector:
-    def __init__(self, client_id: str = None, client_secret: str = None):
+    CATEGORIES = ["Fashion", "Digital", "Food", "Living"]
+
+    def __init__(self, client_id: str = None, client_secret: str = None, browser_pool=None):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.db = Database()
-        self.is_updating = False
+        self.browser_pool = browser_pool # Shared BrowserPool; None = scrapers launch their own
+        self.db = get_database() # Shared async DB (queries run off the event loop)
+        self.writer = get_write_queue() # Write-behind queue for trend batches
+        self.datalab = get_datalab() # Shared DataLab client (chart prefetch)
+        self.cache = TrendCache() # Per-category read cache for /api/trends
+        self.keywords = get_keyword_index() # Canonical spelling of keyword variants
+        self.listeners = [] # Called with {category: saved_batch} after each collection
+        self.jobs = CollectionCoordinator(self._collect) # At most one collection in flight
+
+    @property
+    def is_updating(self):
+        return self.jobs.is_running
 
     async def get_trends(self, source: str = "all", category_filter: str = "all"):
         """
         Fetch trends:
-        1. Try DB (FAST)
-        2. If DB empty, Return Mock (FAST) + Trigger Background Scrape
+        1. Try in-memory cache (stale entries are revalidated in background)
+        2. Cache miss -> DB (FAST)
+        3. If DB empty, Return Mock (FAST) + Trigger Background Scrape
         """
-        import asyncio
-        # 1. Try DB
-        print(f"[COLLECTOR] Fetching trends for {category_filter} from DB...")
-        try:
-            # Run sync DB call in thread to avoid blocking loop, with 3s timeout
-            db_trends = await asyncio.wait_for(
-                asyncio.to_thread(self.db.get_latest_trends, category_filter),
-                timeout=3.0
-            )
-        except asyncio.TimeoutError:
-            print("[COLLECTOR] DB Read Timed Out (>3s). Falling back to Mock.")
-            db_trends = None
-        except Exception as e:
-            print(f"[COLLECTOR] DB Read Error: {e}")
-            db_trends = None
-        if db_trends:
-            # Check Staleness Logic
-            try:
-                latest_ts_str = db_trends[0].get("created_at")
-                if latest_ts_str:
-                    from datetime import datetime, timedelta, timezone
-                    # Supabase returns UTC ISO string usually with +00:00 or Z
-                    # Safe parsing
-                    latest_ts = datetime.fromisoformat(latest_ts_str.replace('Z', '+00:00'))
-                    now = datetime.now(timezone.utc)
-                    
-                    if (now - latest_ts) > timedelta(hours=1):
-                        if not self.is_updating:
-                            print(f"[COLLECTOR] Data is STALE (Last update: {latest_ts_str}). Triggering background refresh.")
-                            self.is_updating = True
-                            import asyncio
-                            asyncio.create_task(self.collect_all_and_save())
-                        else:
-                            print(f"[COLLECTOR] Data is STALE but update already in progress.")
-                    else:
-                        print(f"[COLLECTOR] Data is FRESH (Last update: {latest_ts_str}). Skipping update.")
-            except Exception as e:
-                print(f"[COLLECTOR] Error checking staleness: {e}. Ignoring.")
+        trends = await self.cache.get_or_load(category_filter, lambda: self._load_from_db(category_filter))
 
-            print(f"[COLLECTOR] Found {len(db_trends)} items in DB.")
-            return db_trends
+        if trends:
+            self._check_staleness(trends)
+            return trends
 
-        # 2. Failover: DB empty (Cold Start)
+        # Failover: DB empty (Cold Start)
         # Instead of blocking for 60s to scrape, return Mocks immediately
         # and start scraping in the background.
         print(f"[COLLECTOR] DB empty. Returning MOCKS immediately and triggering background scrape.")
         
-        import asyncio
-        # Trigger full refresh in background
-        asyncio.create_task(self.collect_all_and_save())
+        # Trigger full refresh in background (joins a run already in flight)
+        self.start_collection("cold_start")
         
         # Return mock data instant response
         return self.get_mock_trends(category_filter)
-        
-    async def collect_all_and_save(self):
+
+    async def _load_from_db(self, category_filter):
         """
-        Background Job: Scrape ALL categories and save to DB.
+        Cache loader: one query loads the latest batch of EVERY category,
+        primes the cache for all of them and returns the requested one (or None).
+        A cached batch newer than the DB's (collected, write still queued) is kept.
         """
-        self.is_updating = True
+        import asyncio
+        print(f"[COLLECTOR] Fetching latest batches from DB (requested: {category_filter})...")
         try:
-            print("[BACKGROUND] Starting hourly trend collection...")
-            categories = ["Fashion", "Digital", "Food", "Living"]
-            
-            # 1. Scrape specific categories
-            for cat in categories:
-                print(f"[BACKGROUND] Scraping {cat}...")
-                trends = await self._scrape_live("shopping", cat)
-                if trends:
-                    self.db.save_trends(cat, trends)
-                    
-            # 2. Scrape "all" (Integrated)
-            print(f"[BACKGROUND] Scraping Integrated...")
-            trends_all = await self._scrape_live("all", "all")
-            if trends_all:
-                self.db.save_trends("all", trends_all)
-                
-            print("[BACKGROUND] Collection complete.")
+            # DB calls run on the DB thread pool; cap the wait at 3s
+            batches = await asyncio.wait_for(self.db.get_latest_batches(), timeout=3.0)
+        except asyncio.TimeoutError:
+            print("[COLLECTOR] DB Read Timed Out (>3s). Falling back to Mock.")
+            return None
         except Exception as e:
-            print(f"[BACKGROUND] Error during collection: {e}")
-        finally:
-            self.is_updating = False
-            print("[BACKGROUND] Lock released.")
+            print(f"[COLLECTOR] DB Read Error: {e}")
+            return None
+
+        for cat, trends in batches.items():
+            if cat != category_filter and trends and not self._cached_is_newer(cat, trends):
+                self.cache.set(cat, trends)
 
-    async def _scrape_live(self, source, category_filter):
+        db_trends = batches.get(category_filter)
+        if db_trends and self._cached_is_newer(category_filter, db_trends):
+            return self.cache.peek(category_filter)
+        if db_trends:
+            print(f"[COLLECTOR] Found {len(db_trends)} items in DB.")
+        return db_trends or None
+
+    def _cached_is_newer(self, category, trends):
+        """True if the cached batch of `category` was created after `trends`."""
+        cached = self.cache.peek(category)
+        if not cached:
+            return False
+        cached_at = parse_timestamp(cached[0].get("created_at"))
+        loaded_at = parse_timestamp(trends[0].get("created_at"))
+        return cached_at is not None and (loaded_at is None or cached_at > loaded_at)
+
+    def _check_staleness(self, trends):
         """
-        Internal method to reuse scraping logic.
+        Trigger a background collection if the served batch is older than 1 hour.
         """
-        trends = []
         try:
-            import asyncio
-            
-            if source in ["shopping", "all"] or category_filter != "all":
-                from backend.scrapers.naver_scraper import NaverShoppingScraper
-                # Naver scraper returns [{"keyword": "...", "category": "..."}, ...]
-                # Optimization: Pass category to scraper if supported?
-                # Currently scraper fetches ALL. Ideally we optimize scraper to fetch only target.
-                # But current scraper fetches all 4. 
-                # Let's just filter.
-                print(" -> Invoking NaverShoppingScraper (Async)...")
-                naver_trends_raw = await NaverShoppingScraper().get_trends()
+            latest_ts_str = trends[0].get("created_at")
+            if latest_ts_str:
+                from datetime import datetime, timedelta, timezone
+                # Supabase returns UTC ISO string usually with +00:00 or Z
+                # Safe parsing
+                latest_ts = datetime.fromisoformat(latest_ts_str.replace('Z', '+00:00'))
+                now = datetime.now(timezone.utc)
                 
-                for item in naver_trends_raw:
-                    kw = item["keyword"]
-                    cat = item["category"]
-                    
-                    if category_filter != "all" and cat != category_filter:
-                        continue
-                    
-                    trends.append({"keyword": kw, "source": "Naver Shopping", "category": cat})
-            
-            # YouTube (only for 'all' or specific youtube tab?)
-            # Assuming YouTube is general
-            if source in ["youtube", "all"] and category_filter == "all":
+                if (now - latest_ts) > timedelta(hours=1):
+                    if not self.is_updating:
+                        print(f"[COLLECTOR] Data is STALE (Last update: {latest_ts_str}). Triggering background refresh.")
+                        self.start_collection("stale")
+                    else:
+                        print(f"[COLLECTOR] Data is STALE but update already in progress.")
+        except Exception as e:
+            print(f"[COLLECTOR] Error checking staleness: {e}. Ignoring.")
+        
+    def start_collection(self, trigger: str):
+        """
+        Start a background collection, or join the one in flight.
+        Returns:
+            tuple: (CollectionJob, coalesced: bool), job is None when another
+                   worker holds the collector lease
+        """
+        return self.jobs.trigger(trigger)
+
+    async def collect_all_and_save(self, trigger: str = "direct"):
+        """
+        Run a collection (or join the one in flight) and wait for it.
+        Returns:
+            CollectionJob, or None when another worker holds the collector lease
+        """
+        return await self.jobs.run(trigger)
+
+    async def _collect(self, job):
+        """
+        Background Job: Scrape every source ONCE and save all categories to DB.
+        Naver Shopping already returns all 4 categories in a single run, so we
+        partition its results in memory instead of re-scraping per category.
+        Each step is recorded as a stage of `job`.
+        """
+        print("[BACKGROUND] Starting hourly trend collection...")
+
+        # 1. Run each source exactly once
+        with job.stage("scrape"):
+            naver_trends, youtube_trends = await self._scrape_sources()
+
+        # 2. Partition into per-category batches + integrated "all" batch
+        with job.stage("build_batches"):
+            batches = self._build_batches(naver_trends, youtube_trends)
+            await self._learn_keywords(batches)
+
+        # 3. Queue everything as one bulk write and refresh the read cache
+        #    right away (rows carry the batch_id/created_at they will be stored with)
+        with job.stage("save"):
+            saved_batches = self.writer.enqueue_trends(batches)
+            for cat, rows in saved_batches.items():
+                self.cache.set(cat, rows)
+
+        with job.stage("notify"):
+            for listener in self.listeners:
                 try:
-                    from backend.scrapers.youtube_scraper import YoutubeScraper
-                    print(" -> Invoking YoutubeScraper (Async)...")
-                    youtube_trends = await YoutubeScraper().get_trends()
-                    trends.extend([{"keyword": t, "source": "YouTube", "category": "General"} for t in youtube_trends])
+                    listener(saved_batches)
                 except Exception as e:
-                    print(f" -> [WARNING] YouTube scraper failed: {e}")
-                
-            if not trends:
-                print(" -> [WARNING] No trends found. Returning MOCK data.")
-                return self.get_mock_trends(category_filter)
-            
-            return trends
-            
+                    print(f"[BACKGROUND] Listener failed: {e}")
+
+        # 4. Prefetch 1-year charts for every keyword in batched DataLab requests
+        with job.stage("prefetch_charts"):
+            await self.prefetch_charts(saved_batches)
+
+        print("[BACKGROUND] Collection complete.")
+
+    async def prefetch_charts(self, batches: dict):
+        """
+        Warm the DataLab series cache with the 1-year chart of every collected
+        keyword (MAX_GROUPS = 5 keywords per request, no anchor needed for
+        self-normalized charts), so the first
+        /api/analyze for a keyword does not wait on DataLab.
+        """
+        if os.getenv("PREFETCH_CHARTS", "1") == "0":
+            return
+        keywords = [self.keywords.canonical(row["keyword"]) for rows in batches.values() for row in rows]
+        if not keywords:
+            return
+        try:
+            series = await self.datalab.get_daily_trends(keywords, days=365)
+            print(f"[BACKGROUND] Prefetched charts for {len(series)} keywords.")
+        except Exception as e:
+            print(f"[BACKGROUND] Chart prefetch failed: {e}")
+
+    async def _learn_keywords(self, batches: dict):
+        """Update the alias table, best ranks first (they become canonical)."""
+        import asyncio
+        # Scraper rank (stable sort: rank 1 of every category before any rank 2)
+        rows = sorted((trend for trends in batches.values() for trend in trends), key=lambda t: t["rank"])
+        try:
+            aliases = await asyncio.to_thread(self.keywords.learn, [trend["keyword"] for trend in rows])
+            if aliases:
+                print(f"[BACKGROUND] Registered {aliases} new keywords.")
         except Exception as e:
-            print(f"[ERROR] Live scrape failed: {e}")
-            return self.get_mock_trends(category_filter)
+            print(f"[BACKGROUND] Keyword index update failed: {e}")
+
+    async def _scrape_sources(self):
+        """
+        Run every scraper once per cycle.
+        Returns:
+            tuple: (naver_trends, youtube_trends)
+            naver_trends: [{"keyword": "...", "source": "Naver Shopping", "category": "Fashion", "rank": 1}, ...]
+            youtube_trends: [{"keyword": "...", "source": "YouTube", "category": "General", "rank": 1}, ...]
+        """
+        naver_trends = []
+        youtube_trends = []
+
+        try:
+            from backend.scrapers.naver_scraper import NaverShoppingScraper
+            print(" -> Invoking NaverShoppingScraper (Async)...")
+            naver_trends_raw = await NaverShoppingScraper(pool=self.browser_pool).get_trends()
+            naver_trends = [
+                {"keyword": item["keyword"], "source": "Naver Shopping", "category": item["category"], "rank": item["rank"]}
+                for item in naver_trends_raw
+            ]
+        except Exception as e:
+            print(f" -> [WARNING] Naver scraper failed: {e}")
+
+        try:
+            from backend.scrapers.youtube_scraper import YoutubeScraper
+            print(" -> Invoking YoutubeScraper (Async)...")
+            youtube_raw = await YoutubeScraper(pool=self.browser_pool).get_trends()
+            youtube_trends = [
+                {"keyword": t, "source": "YouTube", "category": "General", "rank": rank}
+                for rank, t in enumerate(youtube_raw, 1)
+            ]
+        except Exception as e:
+            print(f" -> [WARNING] YouTube scraper failed: {e}")
+
+        return naver_trends, youtube_trends
+
+    def _build_batches(self, naver_trends, youtube_trends):
+        """
+        Split one cycle's scrape results into the batches we store.
+        Categories without live data fall back to MOCK data (same as before).
+        Returns:
+            dict: {"Fashion": [...], "Digital": [...], "Food": [...], "Living": [...], "all": [...]}
+        """
+        batches = {}
+        for cat in self.CATEGORIES:
+            trends = [item for item in naver_trends if item["category"] == cat]
+            if not trends:
+                print(f" -> [WARNING] No trends found for {cat}. Using MOCK data.")
+                trends = self.get_mock_trends(cat)
+            batches[cat] = trends
+
+        # Integrated: every Naver category + YouTube
+        trends_all = naver_trends + youtube_trends
+        if not trends_all:
+            print(" -> [WARNING] No trends found for all. Using MOCK data.")
+            trends_all = self.get_mock_trends("all")
+        batches["all"] = trends_all
+
+        return batches
 
     def get_mock_trends(self, category_filter="all"):
         mocks = {
@@ -159,7 +269,7 @@ class TrendCollector:
         
         selected_mocks = mocks.get(category_filter, mocks["all"])
         
-        return [{"keyword": t, "source": "Mock", "category": category_filter} for t in selected_mocks]
+        return [{"keyword": t, "source": "Mock", "category": category_filter, "rank": rank} for rank, t in enumerate(selected_mocks, 1)]
 
     def get_google_daily_trends(self, geo="KR"):
         # Deprecated in favor of get_trends
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+COLLECTOR_LEASE_PATH = os.getenv("COLLECTOR_LEASE_PATH", os.path.join("data", "collector_lease.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collector_lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    pending TEXT
+);
+"""
+
+class CollectorLease:
+    """
+    Lease-based leader election between processes sharing a SQLite file
+    (e.g. `uvicorn --workers N`): exactly one holder runs the collector,
+    the others only serve.
+    - The leader renews the lease every ttl/3 seconds.
+    - If it dies (or stalls past the ttl) the lease expires and the next
+      worker to renew takes over.
+    - Followers hand collection triggers to the leader via request_run().
+    """
+    def __init__(self, path: str = None, ttl: float = None, name: str = "collector"):
+        self.path = path or COLLECTOR_LEASE_PATH
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.ttl = ttl or float(os.getenv("COLLECTOR_LEASE_TTL", "90"))
+        self.name = name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        # Async callbacks set by the owner
+        self.on_elected = None
+        self.on_demoted = None
+        self.on_requested = None # called with the trigger forwarded by a follower
+        self._local = threading.local()
+        self._task = None
+        self._last_request = 0
+        self._request_task = None
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self):
+        """
+        Take the lease if it is free or expired, or renew it if we hold it.
+        Returns:
+            bool: True if we hold the lease now
+        """
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            # One statement: SQLite serializes writers, so only one worker wins
+            conn.execute(
+                "INSERT INTO collector_lease (name, holder, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+                "WHERE collector_lease.holder = excluded.holder OR collector_lease.expires_at < ?",
+                (self.name, self.holder, now + self.ttl, now)
+            )
+        return self.leader() == self.holder
+
+    def leader(self):
+        """Returns: str, the current (unexpired) holder, or None."""
+        row = self._conn().execute(
+            "SELECT holder, expires_at FROM collector_lease WHERE name = ?", (self.name,)
+        ).fetchone()
+        if not row or row[1] < time.time():
+            return None
+        return row[0]
+
+    def release(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE collector_lease SET expires_at = 0 WHERE name = ? AND holder = ?",
+                (self.name, self.holder)
+            )
+
+    def request_run(self, trigger: str):
+        """
+        Follower: ask the leader for a collection (at most once a minute per
+        process). On the event loop, the SQLite write runs in a thread.
+        Returns:
+            bool: False if throttled (a request was forwarded less than a minute ago)
+        """
+        if time.monotonic() - self._last_request < 60:
+            return False
+        self._last_request = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_request(trigger)
+            return True
+        self._request_task = loop.create_task(self._write_request_async(trigger))
+        return True
+
+    def _write_request(self, trigger: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE collector_lease SET pending = ? WHERE name = ?", (trigger, self.name))
+        print(f"[LEASE] Forwarded '{trigger}' collection request to the leader.")
+
+    async def _write_request_async(self, trigger: str):
+        try:
+            await asyncio.to_thread(self._write_request, trigger)
+        except Exception as e:
+            print(f"[LEASE] Failed to forward '{trigger}': {e}")
+
+    def take_request(self):
+        """Leader: pop a trigger forwarded by a follower, if any."""
+        conn = self._conn()
+        with conn:
+            row = conn.execute(
+                "SELECT pending FROM collector_lease WHERE name = ? AND holder = ?", (self.name, self.holder)
+            ).fetchone()
+            if not row or not row[0]:
+                return None
+            conn.execute("UPDATE collector_lease SET pending = NULL WHERE name = ?", (self.name,))
+        return row[0]
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            # Let another worker take over right away instead of after the ttl
+            self.release()
+            self.is_leader = False
+
+    def status(self):
+        return {"holder": self.holder, "is_leader": self.is_leader, "leader": self.leader()}
+
+    async def _run(self):
+        while True:
+            try:
+                leader = await asyncio.to_thread(self.try_acquire)
+            except Exception as e:
+                print(f"[LEASE] Renewal failed: {e}")
+                leader = False
+
+            if leader and not self.is_leader:
+                self.is_leader = True
+                print(f"[LEASE] {self.holder} is now the collector leader.")
+                await self._notify(self.on_elected)
+            elif not leader and self.is_leader:
+                self.is_leader = False
+                print(f"[LEASE] {self.holder} lost the collector lease.")
+                await self._notify(self.on_demoted)
+
+            if self.is_leader and self.on_requested:
+                try:
+                    trigger = await asyncio.to_thread(self.take_request)
+                    if trigger:
+                        await self._notify(self.on_requested, trigger)
+                except Exception as e:
+                    print(f"[LEASE] Failed to read forwarded requests: {e}")
+
+            await asyncio.sleep(self.ttl / 3)
+
+    async def _notify(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            await callback(*args)
+        except Exception as e:
+            print(f"[LEASE] Callback failed: {e}")
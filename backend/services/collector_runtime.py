@@ -0,0 +1,111 @@
+import asyncio
+import os
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+class CollectorRuntime:
+    """
+    Everything that makes a process a collector: the browser pool, the
+    hourly scheduler and the collector lease (only the lease holder collects,
+    see CollectorLease). Used by the API server in APP_MODE=all and by the
+    standalone worker (python -m backend.worker).
+    """
+    def __init__(self, collector, browser_pool, lease=None, interval_hours: float = None, shutdown_grace: float = None):
+        self.collector = collector
+        self.browser_pool = browser_pool
+        self.lease = lease
+        self.interval_hours = interval_hours or float(os.getenv("COLLECT_INTERVAL_HOURS", "1"))
+        # How long stop() lets an in-flight collection finish before cancelling it
+        self.shutdown_grace = shutdown_grace if shutdown_grace is not None else float(os.getenv("COLLECTOR_SHUTDOWN_GRACE", "30"))
+        self.scheduler = AsyncIOScheduler()
+        collector.jobs.lease = lease
+
+    async def start(self):
+        print("[SYSTEM] Starting Background Scheduler...")
+        # Coroutine job: runs on the event loop (a plain function would run in a thread)
+        self.scheduler.add_job(self.collector.jobs.scheduled, 'interval', hours=self.interval_hours, args=["scheduled"])
+        # Paused until this process is allowed to collect
+        self.scheduler.start(paused=True)
+
+        if self.lease:
+            # Collect only while holding the lease (failover when the leader dies)
+            self.lease.on_elected = self._start_collecting
+            self.lease.on_demoted = self._stop_collecting
+            self.lease.on_requested = self._run_forwarded
+            self.lease.start()
+        else:
+            await self._start_collecting()
+
+    async def stop(self):
+        """
+        Graceful shutdown: no new runs, let the current one finish (up to
+        shutdown_grace seconds), then hand the lease over and close browsers.
+        """
+        if self.scheduler.running:
+            self.scheduler.pause()
+
+        job = self.collector.jobs.current
+        if job:
+            print(f"[SYSTEM] Waiting up to {self.shutdown_grace:.0f}s for collection {job.id}...")
+            try:
+                await asyncio.wait_for(asyncio.shield(job.task), self.shutdown_grace)
+            except asyncio.TimeoutError:
+                job.task.cancel()
+                await asyncio.gather(job.task, return_exceptions=True)
+            except asyncio.CancelledError:
+                if not job.task.cancelled():
+                    raise # We are being cancelled, not the job
+            except Exception:
+                pass # Already recorded on the job
+
+        if self.lease:
+            await self.lease.stop()
+        print("[SYSTEM] Shutting down Scheduler...")
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        await self.browser_pool.stop()
+
+    def health(self):
+        """
+        Returns:
+            dict: collector state for health checks
+        """
+        jobs = self.collector.jobs.recent()
+        last = next((job for job in jobs if job["status"] != "running"), None)
+        collecting = self.lease.is_leader if self.lease else True
+        return {
+            "status": "ok" if not last or last["status"] == "succeeded" else "degraded",
+            "collecting": collecting,
+            "lease": self.lease.status() if self.lease else None,
+            "browser": self.browser_pool.is_healthy(),
+            "current_job": jobs[0] if jobs and jobs[0]["status"] == "running" else None,
+            "last_job": last
+        }
+
+    async def _start_collecting(self):
+        """Become the collector: browsers, hourly schedule, initial run."""
+        print("[SYSTEM] Starting Browser Pool...")
+        try:
+            await self.browser_pool.start()
+        except Exception as e:
+            # Pool relaunches lazily on first lease, so the process can still boot
+            print(f"[SYSTEM] Browser Pool failed to start: {e}")
+
+        self.scheduler.resume()
+
+        # Run initial collection in background (fire and forget)
+        self.collector.start_collection("startup")
+
+    async def _stop_collecting(self):
+        """Lost the collector lease: another process collects from now on."""
+        self.scheduler.pause()
+        # Stop the run in flight first; it would relaunch the browser and
+        # keep scraping next to the new leader
+        job = self.collector.jobs.current
+        if job:
+            print(f"[SYSTEM] Lease lost: cancelling collection {job.id}...")
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        await self.browser_pool.stop()
+
+    async def _run_forwarded(self, trigger: str):
+        self.collector.start_collection(f"forwarded:{trigger}")
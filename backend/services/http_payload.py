@@ -0,0 +1,78 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Response
+
+class RenderedPayload:
+    """
+    A response body encoded once, with validators for conditional requests.
+    """
+    def __init__(self, data, last_modified: datetime = None):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        last_modified = last_modified or datetime.now(timezone.utc)
+        # HTTP dates have 1s precision
+        self.last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+        self.created_at = time.monotonic()
+
+    def headers(self):
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Let browsers keep the body but always revalidate (cheap 304)
+            "Cache-Control": "no-cache"
+        }
+
+    def is_not_modified(self, request):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def respond(self, request):
+        if self.is_not_modified(request):
+            return Response(status_code=304, headers=self.headers())
+        return Response(content=self.body, media_type="application/json", headers=self.headers())
+
+def parse_timestamp(value):
+    """ISO timestamp from the DB -> aware datetime (None if missing/invalid)."""
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+class RenderedCache:
+    """
+    Small TTL map of RenderedPayloads (e.g. per keyword/period chart responses).
+    """
+    def __init__(self, ttl: float = 3600, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def get(self, key):
+        payload = self._entries.get(key)
+        if payload and time.monotonic() - payload.created_at < self.ttl:
+            return payload
+        self._entries.pop(key, None)
+        return None
+
+    def put(self, key, payload):
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = payload
+        return payload
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+KEYWORD_DB_PATH = os.getenv("KEYWORD_DB_PATH", os.path.join("data", "keywords.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keyword_aliases (
+    normalized TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL
+);
+"""
+
+def normalize_keyword(keyword: str):
+    """
+    Comparison key for a keyword: NFKC (composes decomposed Hangul jamo,
+    folds full-width forms), case-folded, without whitespace or punctuation.
+    "아이폰 16" and "아이폰16", or "Galaxy S24", "galaxy-s24" and "ＧＡＬＡＸＹ Ｓ24",
+    map to the same key.
+    """
+    text = unicodedata.normalize("NFKC", keyword or "").casefold()
+    return "".join(ch for ch in text if not ch.isspace() and not unicodedata.category(ch).startswith("P"))
+
+class KeywordIndex:
+    """
+    Maps keyword variants to one canonical spelling, so caches keyed by
+    keyword (stored analyses, DataLab series, rendered charts) hit across
+    spacing/casing/punctuation variants.
+    - Spelling variants share a normalized key (normalize_keyword); only
+      those are merged, so "아이폰 케이스" never becomes "아이폰".
+    - learn() runs at collection time: the first spelling collected becomes
+      canonical for its key.
+    The alias table is stored in SQLite, so every process sees the same one.
+    canonical() never touches SQLite on the event loop: stale tables are
+    reloaded in a thread in the background.
+    """
+    def __init__(self, path: str = None, reload_interval: float = 60):
+        self.path = path or KEYWORD_DB_PATH
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.reload_interval = reload_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        self._aliases = {}
+        self._loaded_at = 0
+        self._reload_task = None
+        self._reload()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _reload(self):
+        with self._lock:
+            rows = self._conn().execute("SELECT normalized, canonical FROM keyword_aliases").fetchall()
+            self._aliases = dict(rows)
+            self._loaded_at = time.monotonic()
+
+    def _schedule_reload(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts): nothing to block
+            self._reload()
+            return
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = loop.create_task(self._reload_async())
+
+    async def _reload_async(self):
+        try:
+            await asyncio.to_thread(self._reload)
+        except Exception as e:
+            print(f"[KEYWORDS] Alias reload failed: {e}")
+
+    def canonical(self, keyword: str):
+        """
+        Returns:
+            str: the canonical spelling, or the keyword itself (stripped) if unknown
+        """
+        if time.monotonic() - self._loaded_at > self.reload_interval:
+            # Pick up aliases learned by another process (collector worker);
+            # this lookup uses the current table
+            self._schedule_reload()
+        return self._aliases.get(normalize_keyword(keyword)) or (keyword or "").strip()
+
+    def learn(self, keywords: list):
+        """
+        Register collected keywords (best rank first: the first spelling seen
+        becomes canonical).
+        Returns:
+            int: number of newly registered keywords
+        """
+        with self._lock:
+            new = {}
+            for keyword in keywords:
+                key = normalize_keyword(keyword)
+                if not key or key in self._aliases or key in new:
+                    continue
+                new[key] = keyword.strip()
+
+            if new:
+                conn = self._conn()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO keyword_aliases (normalized, canonical) VALUES (?, ?)",
+                        list(new.items())
+                    )
+                self._aliases.update(new)
+            return len(new)
+
+_shared_index = None
+
+def get_keyword_index():
+    """
+    Process-wide KeywordIndex.
+    """
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = KeywordIndex()
+    return _shared_index
@@ -1,59 +1,243 @@
 import os
-import json
-import urllib.request
-from datetime import datetime, timedelta
+import asyncio
+import httpx
+from datetime import date, datetime, timedelta
+from backend.services.series_store import SeriesStore
 
 class NaverDataLab:
-    def __init__(self):
+    """
+    Async client for the DataLab search trend API.
+    One pooled keep-alive httpx connection per process (see get_datalab()),
+    with timeouts and retries on throttling/5xx/network errors.
+    """
+    MAX_GROUPS = 5 # keywordGroups per request (API limit)
+    OVERLAP_DAYS = 7 # Days re-fetched on refresh to rescale new data onto the stored scale
+
+    def __init__(self, timeout: float = None, max_retries: int = 2, transport=None, store=None):
         # Prefer env vars, fallback to provided keys (safe for this local app)
         self.client_id = os.getenv("NAVER_CLIENT_ID", "XcqIIExatxy29XoZ6RHC")
         self.client_secret = os.getenv("NAVER_CLIENT_SECRET", "I1jOucavL2")
         self.url = "https://openapi.naver.com/v1/datalab/search"
+        self.timeout = timeout or float(os.getenv("DATALAB_TIMEOUT", "10"))
+        self.max_retries = max_retries
+        self.transport = transport
+        self._client = None
+        # Persistent daily series (answers any period without upstream calls)
+        self.store = store or SeriesStore()
+
+    def _get_client(self):
+        # Created lazily so it binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                transport=self.transport,
+                headers={
+                    "X-Naver-Client-Id": self.client_id,
+                    "X-Naver-Client-Secret": self.client_secret,
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-    def get_daily_trend(self, keyword: str, days: int = 30):
+    async def get_daily_trend(self, keyword: str, days: int = 30):
         """
         Fetch daily trend ratio for the specified number of days (default: 30).
+        Served from the local SeriesStore; upstream is only asked for days we
+        do not have yet (at most once per keyword per day).
         Returns:
             list: [{"date": "2024-01-01", "ratio": 12.5}, ...]
         """
         try:
-            # Set date range
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            body = {
-                "startDate": start_date.strftime("%Y-%m-%d"),
-                "endDate": end_date.strftime("%Y-%m-%d"),
-                "timeUnit": "date" if days <= 30 else "week" if days > 365 else "date", # Use 'week' for very long ranges if needed, but 'date' is fine for 1 year
-                "keywordGroups": [
-                    {"groupName": keyword, "keywords": [keyword]}
-                ],
-                # "device": "pc", # Optional: 'pc' or 'mo'
-                # "gender": "f",  # Optional
-                # "ages": ["1", "2"] # Optional
-            }
-            
-            request = urllib.request.Request(self.url)
-            request.add_header("X-Naver-Client-Id", self.client_id)
-            request.add_header("X-Naver-Client-Secret", self.client_secret)
-            request.add_header("Content-Type", "application/json")
-            
-            response = urllib.request.urlopen(request, data=json.dumps(body).encode("utf-8"))
-            res_code = response.getcode()
-            
-            if res_code == 200:
-                response_body = response.read().decode('utf-8')
-                data = json.loads(response_body)
-                
-                # Extract results
-                # Response structure: { "results": [ { "title": "...", "keywords": [...], "data": [ { "period": "2024-01-01", "ratio": 15.3 }, ... ] } ] }
-                if data.get('results'):
-                    trend_data = data['results'][0]['data']
-                    # Normalize keys just in case, though API returns 'period' and 'ratio'
-                    return [{"date": item["period"], "ratio": item["ratio"]} for item in trend_data]
-                
-            return []
-            
+            if days > 365:
+                # Weekly granularity: not kept in the daily store
+                series = await self._fetch_groups([keyword], days)
+                return series.get(keyword, [])
+
+            today = date.today()
+            start = today - timedelta(days=days)
+            await self._refresh_series(keyword, start, today)
+            return await asyncio.to_thread(self.store.window, keyword, start, today)
+
         except Exception as e:
             print(f"[NaverDataLab] Error fetching trend for {keyword}: {e}")
             return []
+
+    async def _refresh_series(self, keyword: str, start: date, today: date):
+        """
+        Make sure the store covers [start, today], fetching only what is missing:
+        - older days than stored -> fetch [start, first stored day + overlap]
+        - stale (not refreshed today) -> fetch [last stored day - overlap, today]
+        - nothing stored -> fetch the whole window
+        So a 1-month chart is sliced from an already stored 1-year series with
+        no upstream call at all. SQLite work runs in a thread, off the event loop.
+        """
+        coverage = await asyncio.to_thread(self.store.coverage, keyword)
+        if not coverage:
+            ranges = [(start, today)]
+        else:
+            overlap = timedelta(days=self.OVERLAP_DAYS)
+            ranges = []
+            if coverage["first"] > start:
+                ranges.append((start, min(coverage["first"] + overlap, today)))
+            if coverage["fetched_on"] < today:
+                ranges.append((max(coverage["last"] - overlap, start), today))
+
+        for fetch_start, fetch_end in ranges:
+            series = await self._fetch_groups([keyword], start_date=fetch_start, end_date=fetch_end)
+            fresh = series.get(keyword, [])
+            if fresh and not await asyncio.to_thread(self.store.merge, keyword, fresh) and (fetch_start, fetch_end) != (start, today):
+                # Overlap unusable (e.g. all zeros): refetch the full window
+                series = await self._fetch_groups([keyword], start_date=start, end_date=today)
+                await asyncio.to_thread(self.store.merge, keyword, series.get(keyword, []))
+                return
+
+    async def get_daily_trends(self, keywords: list, days: int = 30, anchor: str = None, scale: str = "self"):
+        """
+        Fetch series for many keywords with as few requests as possible
+        (MAX_GROUPS keyword groups per request).
+        Ratios are only relative within one request, so for a shared scale
+        every request also carries an anchor keyword; each request is
+        rescaled so the anchor's total matches the first request, putting all
+        keywords on one scale.
+        Args:
+            anchor: shared scale only; defaults to DATALAB_ANCHOR_KEYWORD, else the first keyword
+            scale: "self"   -> each series normalized to its own max = 100
+                              (same shape as get_daily_trend, cached for it);
+                              no anchor, MAX_GROUPS keywords per request
+                   "shared" -> one scale across all keywords (global max = 100)
+        Returns:
+            dict: {keyword: [{"date": "...", "ratio": ...}, ...]}
+        """
+        keywords = list(dict.fromkeys(k for k in keywords if k))
+        if not keywords:
+            return {}
+
+        if scale == "shared":
+            anchor = anchor or os.getenv("DATALAB_ANCHOR_KEYWORD") or keywords[0]
+            others = [k for k in keywords if k != anchor]
+            chunk_size = self.MAX_GROUPS - 1
+            groups = [[anchor] + others[i:i + chunk_size] for i in range(0, len(others), chunk_size)] or [[anchor]]
+        else:
+            # Every series is normalized on its own: an anchor would only take a slot
+            anchor = None
+            groups = [keywords[i:i + self.MAX_GROUPS] for i in range(0, len(keywords), self.MAX_GROUPS)]
+
+        semaphore = asyncio.Semaphore(4)
+
+        async def fetch(group):
+            async with semaphore:
+                return await self._fetch_groups(group, days)
+
+        results = await asyncio.gather(*(fetch(group) for group in groups), return_exceptions=True)
+        print(f"[NaverDataLab] Batched {len(keywords)} keywords into {len(groups)} requests" + (f" (anchor: {anchor})" if anchor else ""))
+
+        # Shared scale: rescale every request onto the first successful one via the anchor
+        combined = {}
+        reference_total = None
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                print(f"[NaverDataLab] Batch request failed for {group}: {result}")
+                continue
+
+            factor = 1.0
+            if anchor:
+                anchor_total = sum(point["ratio"] for point in result.get(anchor, []))
+                if reference_total is None:
+                    reference_total = anchor_total
+                if anchor_total <= 0 or reference_total <= 0:
+                    print(f"[NaverDataLab] Anchor '{anchor}' has no volume; skipping {group} for shared scale")
+                    continue
+                factor = reference_total / anchor_total
+
+            for keyword, series in result.items():
+                if keyword not in combined:
+                    combined[keyword] = [{"date": p["date"], "ratio": p["ratio"] * factor} for p in series]
+
+        if anchor and anchor not in keywords:
+            combined.pop(anchor, None)
+
+        if scale == "shared":
+            peak = max((p["ratio"] for series in combined.values() for p in series), default=0)
+            normalized = {kw: self._rescale(series, peak) for kw, series in combined.items()}
+        else:
+            normalized = {}
+            for keyword, series in combined.items():
+                normalized[keyword] = self._rescale(series, max((p["ratio"] for p in series), default=0))
+                if normalized[keyword] and days <= 365:
+                    await asyncio.to_thread(self.store.merge, keyword, normalized[keyword])
+
+        return normalized
+
+    async def _fetch_groups(self, keywords: list, days: int = None, start_date: date = None, end_date: date = None):
+        """
+        One API request with one keyword group per keyword (max MAX_GROUPS),
+        for the last `days` days or an explicit start/end date.
+        Returns:
+            dict: {keyword: [{"date": "2024-01-01", "ratio": 12.5}, ...]}
+        """
+        # Set date range
+        end_date = end_date or datetime.now()
+        start_date = start_date or end_date - timedelta(days=days)
+        days = (end_date - start_date).days
+
+        body = {
+            "startDate": start_date.strftime("%Y-%m-%d"),
+            "endDate": end_date.strftime("%Y-%m-%d"),
+            "timeUnit": "date" if days <= 30 else "week" if days > 365 else "date", # Use 'week' for very long ranges if needed, but 'date' is fine for 1 year
+            "keywordGroups": [
+                {"groupName": keyword, "keywords": [keyword]} for keyword in keywords
+            ],
+            # "device": "pc", # Optional: 'pc' or 'mo'
+            # "gender": "f",  # Optional
+            # "ages": ["1", "2"] # Optional
+        }
+
+        data = await self._post(body)
+
+        # Response structure: { "results": [ { "title": "...", "keywords": [...], "data": [ { "period": "2024-01-01", "ratio": 15.3 }, ... ] } ] }
+        # Normalize keys just in case, though API returns 'period' and 'ratio'
+        return {
+            result["title"]: [{"date": item["period"], "ratio": item["ratio"]} for item in result["data"]]
+            for result in data.get("results") or []
+        }
+
+    @staticmethod
+    def _rescale(series: list, peak: float):
+        if peak <= 0:
+            return [{"date": p["date"], "ratio": 0} for p in series]
+        return [{"date": p["date"], "ratio": round(p["ratio"] / peak * 100, 5)} for p in series]
+
+    async def _post(self, body: dict):
+        """
+        POST to the search trend API, retrying 429/5xx and network errors with backoff.
+        """
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(self.url, json=body)
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code == 429 or e.response.status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = 0.5 * (2 ** attempt)
+                print(f"[NaverDataLab] {e.__class__.__name__}; retrying in {delay}s...")
+                await asyncio.sleep(delay)
+
+_shared_datalab = None
+
+def get_datalab():
+    """
+    Process-wide NaverDataLab (one connection pool shared by API routes and the analyzer).
+    """
+    global _shared_datalab
+    if _shared_datalab is None:
+        _shared_datalab = NaverDataLab()
+    return _shared_datalab
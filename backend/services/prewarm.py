@@ -0,0 +1,103 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+
+class AnalysisPrewarmer:
+    """
+    Background worker pool that analyzes newly collected keywords before
+    anyone clicks them.
+    - enqueue() is a collector listener: the top `top_n` keywords of every
+      category are queued, best rank first (rank 1 of every category before
+      any rank 2).
+    - `workers` analyses run at once; keywords that already have a stored
+      reason are skipped without spending anything.
+    - At most `max_per_hour` LLM analyses are started per rolling hour; the
+      rest wait in the queue for budget.
+    """
+    def __init__(self, analyzer, workers: int = None, top_n: int = None, max_per_hour: int = None):
+        self.analyzer = analyzer
+        self.workers = workers or int(os.getenv("PREWARM_WORKERS", "2"))
+        self.top_n = top_n or int(os.getenv("PREWARM_TOP_N", "5"))
+        self.max_per_hour = max_per_hour if max_per_hour is not None else int(os.getenv("PREWARM_MAX_PER_HOUR", "40"))
+        self.enabled = os.getenv("PREWARM_ANALYSIS", "1") != "0"
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count() # Tie-breaker: FIFO within the same rank
+        self._seen = set()
+        self._spent = deque() # Start times of budgeted analyses (last hour)
+        self._tasks = []
+        self.stats = {"queued": 0, "warmed": 0, "skipped_cached": 0, "failed": 0, "budget_waits": 0}
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, batches: dict):
+        """
+        Queue keywords not seen before.
+        Args:
+            batches: {category: [{"keyword", "rank", ...}]} as saved by the collector
+        """
+        if not self.enabled or not self.analyzer.client:
+            return
+
+        if len(self._seen) > 5000:
+            self._seen.clear() # Stored reasons are still skipped cheaply
+
+        queued = 0
+        for rows in batches.values():
+            for row in rows[:self.top_n]:
+                keyword = self.analyzer.keywords.canonical(row["keyword"])
+                if keyword in self._seen:
+                    continue
+                self._seen.add(keyword)
+                self._queue.put_nowait((row.get("rank", 0), next(self._order), keyword))
+                queued += 1
+
+        self.stats["queued"] += queued
+        if queued:
+            print(f"[PREWARM] Queued {queued} keywords for analysis.")
+            # Lazily start (no lifespan, e.g. scripts)
+            self.start()
+
+    async def _run(self):
+        while True:
+            _, _, keyword = await self._queue.get()
+            try:
+                await self._warm(keyword)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"[PREWARM] Analysis failed for '{keyword}': {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _warm(self, keyword):
+        analyzer = self.analyzer
+        if analyzer.writer.peek_analysis(keyword) or await analyzer.db.get_analysis(keyword):
+            self.stats["skipped_cached"] += 1
+            return
+
+        await self._acquire_budget()
+        await analyzer.analyze_trend(keyword)
+        self.stats["warmed"] += 1
+
+    async def _acquire_budget(self):
+        """Wait until fewer than max_per_hour analyses started in the last hour."""
+        while True:
+            now = time.monotonic()
+            while self._spent and now - self._spent[0] >= 3600:
+                self._spent.popleft()
+            if len(self._spent) < self.max_per_hour:
+                self._spent.append(now)
+                return
+            self.stats["budget_waits"] += 1
+            wait = 3600 - (now - self._spent[0])
+            print(f"[PREWARM] Hourly budget ({self.max_per_hour}) spent; waiting {wait:.0f}s")
+            await asyncio.sleep(wait)
@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+
+SERIES_DB_PATH = os.getenv("SERIES_DB_PATH", os.path.join("data", "series.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_volume (
+    keyword TEXT NOT NULL,
+    date TEXT NOT NULL,
+    ratio REAL NOT NULL,
+    PRIMARY KEY (keyword, date)
+);
+
+CREATE TABLE IF NOT EXISTS search_volume_meta (
+    keyword TEXT PRIMARY KEY,
+    fetched_on TEXT NOT NULL
+);
+"""
+
+class SeriesStore:
+    """
+    Local time-series store of daily DataLab search volume, keyed by keyword.
+    Ratios are kept on one consistent scale per keyword: incoming series are
+    rescaled onto the stored one using the dates they overlap. Any period is
+    answered from storage, re-normalized to 0-100 for that window.
+    """
+    def __init__(self, path: str = None):
+        self.path = path or SERIES_DB_PATH
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def coverage(self, keyword: str):
+        """
+        Returns:
+            dict: {"first": date, "last": date, "fetched_on": date} or None
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT MIN(date), MAX(date) FROM search_volume WHERE keyword = ?", (keyword,)
+        ).fetchone()
+        meta = conn.execute(
+            "SELECT fetched_on FROM search_volume_meta WHERE keyword = ?", (keyword,)
+        ).fetchone()
+        if not row or row[0] is None or not meta:
+            return None
+        return {
+            "first": date.fromisoformat(row[0]),
+            "last": date.fromisoformat(row[1]),
+            "fetched_on": date.fromisoformat(meta[0])
+        }
+
+    def merge(self, keyword: str, series: list):
+        """
+        Merge a freshly fetched series ([{"date", "ratio"}], any scale).
+        Overlapping dates give the factor that maps it onto the stored scale;
+        without a usable overlap the stored series is replaced.
+        Returns:
+            bool: True if rescaled onto existing data, False if replaced.
+        """
+        if not series:
+            return False
+
+        with self._lock:
+            conn = self._conn()
+            stored = dict(conn.execute(
+                "SELECT date, ratio FROM search_volume WHERE keyword = ?", (keyword,)
+            ).fetchall())
+
+            overlap = [p for p in series if p["date"] in stored]
+            stored_total = sum(stored[p["date"]] for p in overlap)
+            incoming_total = sum(p["ratio"] for p in overlap)
+            rescaled = stored_total > 0 and incoming_total > 0
+
+            with conn:
+                if rescaled:
+                    factor = stored_total / incoming_total
+                else:
+                    factor = 1.0
+                    conn.execute("DELETE FROM search_volume WHERE keyword = ?", (keyword,))
+
+                conn.executemany(
+                    "INSERT INTO search_volume (keyword, date, ratio) VALUES (?, ?, ?) "
+                    "ON CONFLICT(keyword, date) DO UPDATE SET ratio = excluded.ratio",
+                    [(keyword, p["date"], p["ratio"] * factor) for p in series]
+                )
+                conn.execute(
+                    "INSERT INTO search_volume_meta (keyword, fetched_on) VALUES (?, ?) "
+                    "ON CONFLICT(keyword) DO UPDATE SET fetched_on = excluded.fetched_on",
+                    (keyword, date.today().isoformat())
+                )
+        return rescaled
+
+    def window(self, keyword: str, start: date, end: date):
+        """
+        Stored series between start and end (inclusive), normalized to max = 100.
+        Returns:
+            list: [{"date": "2024-01-01", "ratio": 12.5}, ...]
+        """
+        rows = self._conn().execute(
+            "SELECT date, ratio FROM search_volume WHERE keyword = ? AND date >= ? AND date <= ? ORDER BY date",
+            (keyword, start.isoformat(), end.isoformat())
+        ).fetchall()
+
+        peak = max((ratio for _, ratio in rows), default=0)
+        if peak <= 0:
+            return [{"date": d, "ratio": 0} for d, _ in rows]
+        return [{"date": d, "ratio": round(ratio / peak * 100, 5)} for d, ratio in rows]
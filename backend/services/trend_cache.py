@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+
+class TrendCache:
+    """
+    In-process stale-while-revalidate cache (one entry per category).
+    - Fresh entry: served from memory.
+    - Stale entry: served from memory, refreshed in the background.
+    - Missing entry: loaded once; concurrent callers await the same load.
+    At most one refresh per key is ever in flight.
+    """
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("TREND_CACHE_TTL", "300"))
+        self._entries = {}
+        self._inflight = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def set(self, key, value):
+        self._entries[key] = {"value": value, "stored_at": time.monotonic()}
+
+    def peek(self, key):
+        entry = self._entries.get(key)
+        return entry["value"] if entry else None
+
+    async def get_or_load(self, key, loader):
+        """
+        Args:
+            loader: async callable returning the value, or None when there is
+                    nothing to cache (the old entry, if any, is kept).
+        """
+        entry = self._entries.get(key)
+        if entry:
+            if time.monotonic() - entry["stored_at"] < self.ttl:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                self._refresh(key, loader)
+            return entry["value"]
+
+        self.stats["misses"] += 1
+        return await self._refresh(key, loader)
+
+    def _refresh(self, key, loader):
+        """Start (or join) the single in-flight load for `key`."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a cancelled request does not cancel the shared load
+        return asyncio.shield(task)
+
+    async def _load(self, key, loader):
+        self.stats["refreshes"] += 1
+        try:
+            value = await loader()
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            print(f"[CACHE] Refresh failed for '{key}': {e}")
+            return self.peek(key)
+
+        if value:
+            self.set(key, value)
+            return value
+        return self.peek(key)
@@ -0,0 +1,122 @@
+import asyncio
+import os
+from backend.database import build_batch, get_database
+
+class WriteBehindQueue:
+    """
+    Background write-behind queue for trend batches and analysis upserts.
+    - Callers never wait on the DB: enqueue_* returns immediately.
+    - Pending writes are coalesced: all trend batches go out as one bulk
+      insert, analyses as one upsert (last write per keyword wins).
+    - Failed flushes are retried with exponential backoff.
+    - stop() flushes whatever is left (called from the FastAPI lifespan).
+    """
+    def __init__(self, db=None, flush_interval: float = None, max_retries: int = 5):
+        self.db = db or get_database()
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("WRITE_FLUSH_INTERVAL", "1.0"))
+        self.max_retries = max_retries
+        self._trend_batches = {} # {category: rows} (newer batch for a category replaces an unflushed older one)
+        self._analyses = {} # {keyword: {"keyword", "reason", "chart_data"}}
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._stopping = False
+        self.stats = {"enqueued": 0, "flushes": 0, "round_trips": 0, "retries": 0, "dropped": 0}
+
+    def start(self):
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush pending writes and stop the worker."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._worker:
+            await self._worker
+            self._worker = None
+        await self._flush()
+
+    def enqueue_trends(self, batches: dict):
+        """
+        Queue trend batches ({category: trends}).
+        Returns:
+            dict: {category: rows} exactly as they will be stored (batch_id, created_at),
+                  so callers can serve them before the write lands.
+        """
+        built = {}
+        for category, trends in batches.items():
+            if trends:
+                built[category] = build_batch(category, trends)
+        self._trend_batches.update(built)
+        self._enqueued(len(built))
+        return built
+
+    def enqueue_analysis(self, keyword: str, reason: str, chart_data: list):
+        self._analyses[keyword] = {"keyword": keyword, "reason": reason, "chart_data": chart_data}
+        self._enqueued(1)
+
+    def peek_analysis(self, keyword: str):
+        """Read-your-writes: an analysis that is queued but not flushed yet."""
+        return self._analyses.get(keyword)
+
+    def _enqueued(self, count):
+        self.stats["enqueued"] += count
+        # Lazily start (e.g. populate_db.py without a lifespan)
+        self.start()
+        self._wakeup.set()
+
+    async def _run(self):
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            # Let writes that arrive together (e.g. 5 categories) coalesce
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self):
+        trend_batches, self._trend_batches = self._trend_batches, {}
+        analyses = list(self._analyses.values())
+
+        if trend_batches:
+            await self._write("save_trend_batches", trend_batches)
+        if analyses:
+            if await self._write("save_analyses", analyses):
+                # Keep entries re-queued while we were writing
+                for item in analyses:
+                    if self._analyses.get(item["keyword"]) is item:
+                        del self._analyses[item["keyword"]]
+
+    async def _write(self, method: str, payload):
+        self.stats["flushes"] += 1
+        for attempt in range(self.max_retries):
+            try:
+                self.stats["round_trips"] += 1
+                await getattr(self.db, method)(payload)
+                return True
+            except Exception as e:
+                delay = min(2 ** attempt, 30)
+                print(f"[WRITER] {method} failed ({e}). Retry {attempt + 1}/{self.max_retries} in {delay}s")
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+        print(f"[WRITER] Giving up on {method} after {self.max_retries} attempts.")
+        self.stats["dropped"] += 1
+        if method == "save_analyses":
+            # Drop them, otherwise they would be retried forever
+            for item in payload:
+                if self._analyses.get(item["keyword"]) is item:
+                    del self._analyses[item["keyword"]]
+        return False
+
+_shared_queue = None
+
+def get_write_queue():
+    """
+    Process-wide WriteBehindQueue.
+    """
+    global _shared_queue
+    if _shared_queue is None:
+        _shared_queue = WriteBehindQueue()
+    return _shared_queue
@@ -0,0 +1,22 @@
+-- Batch identifiers + latest-batch pointer for the 'trends' table.
+-- Run once in the Supabase SQL editor. Database falls back to the old
+-- created_at-based queries until this has been applied.
+
+alter table trends add column if not exists batch_id uuid;
+-- Unique: a retried batch write upserts instead of duplicating rows
+create unique index if not exists trends_batch_id_rank_key on trends (batch_id, rank);
+
+-- One row per category, pointing at its latest COMPLETE batch.
+-- Updated only after all rows of the batch were inserted.
+create table if not exists trend_batches (
+    category text primary key,
+    batch_id uuid not null,
+    size integer not null,
+    created_at timestamptz not null
+);
+
+-- Latest batch of every category: one indexed join.
+create or replace view latest_trends as
+select t.category, t.keyword, t.rank, t.created_at, t.batch_id
+from trend_batches b
+join trends t on t.batch_id = b.batch_id;
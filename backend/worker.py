@@ -0,0 +1,99 @@
+"""
+Standalone collector worker: scraping, the hourly schedule, chart prefetch
+and analysis pre-warming in their own process, so the API server only reads.
+
+    python -m backend.worker                      # health on :8001
+    APP_MODE=api uvicorn backend.main:app         # read-only API next to it
+
+Both processes must share storage: the same STORAGE_BACKEND/SQLITE_PATH and
+the same data/ directory (series, keyword and lease files). In containers
+this means one volume mounted on /app/data in both (see the Dockerfile);
+it is required, not an optimization. Without it the API never sees the
+worker's lease and answers /api/manual-update with 503. Several workers
+can run for failover: the collector lease keeps exactly one collecting.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.scrapers.browser_pool import BrowserPool
+from backend.services.analyzer import TrendAnalyzer
+from backend.services.collector import TrendCollector
+from backend.services.collector_lease import CollectorLease
+from backend.services.collector_runtime import CollectorRuntime
+from backend.services.naver_datalab import get_datalab
+from backend.services.prewarm import AnalysisPrewarmer
+
+browser_pool = BrowserPool()
+collector = TrendCollector(browser_pool=browser_pool)
+analyzer = TrendAnalyzer()
+prewarmer = AnalysisPrewarmer(analyzer)
+# Analyze the top new keywords in the background before users click them
+collector.listeners.append(prewarmer.enqueue)
+
+collector_lease = CollectorLease() if os.getenv("COLLECTOR_LEASE", "1") != "0" else None
+runtime = CollectorRuntime(collector, browser_pool, lease=collector_lease)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    print("[WORKER] Starting collector worker...")
+    collector.writer.start()
+    prewarmer.start()
+    await runtime.start()
+
+    yield
+
+    # Shutdown (SIGTERM/SIGINT): finish the current run, then flush writes
+    print("[WORKER] Shutting down...")
+    await runtime.stop()
+    await prewarmer.stop()
+    print("[SYSTEM] Flushing pending DB writes...")
+    await collector.writer.stop()
+    collector.db.close()
+    await get_datalab().close()
+
+app = FastAPI(title="Korea Trend Collector", description="Collector worker health and control", version="1.0.0", lifespan=lifespan)
+
+@app.get("/health")
+async def health():
+    """
+    Liveness plus collector state (lease, browser, current and last run).
+    """
+    # Lease status reads SQLite: keep it off the event loop
+    return await asyncio.to_thread(runtime.health)
+
+@app.post("/collect")
+async def collect():
+    """
+    Trigger a collection; joins a run already in flight.
+    """
+    job, coalesced = collector.start_collection("manual")
+    if job is None:
+        leader = await asyncio.to_thread(collector_lease.leader)
+        return JSONResponse(status_code=202, content={"status": "throttled" if coalesced else "forwarded", "job_id": None, "leader": leader})
+    return JSONResponse(status_code=202, content={"status": "accepted", "job_id": job.id, "coalesced": coalesced})
+
+@app.get("/jobs")
+async def list_jobs():
+    return {"running": collector.jobs.current.id if collector.jobs.current else None, "jobs": collector.jobs.recent()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = collector.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job.to_dict()
+
+if __name__ == "__main__":
+    uvicorn.run(
+        app,
+        host=os.getenv("WORKER_HOST", "0.0.0.0"),
+        port=int(os.getenv("WORKER_PORT", "8001")),
+        # Leave room for CollectorRuntime's shutdown grace period
+        timeout_graceful_shutdown=int(float(os.getenv("COLLECTOR_SHUTDOWN_GRACE", "30"))) + 10
+    )
@@ -3,20 +3,19 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { ExternalLink, Newspaper, TrendingUp, Search } from 'lucide-react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 
+const PERIOD_LABELS = { '1mo': '1개월', '3mo': '3개월', '6mo': '6개월', '1yr': '1년' };
+
 const TrendDetailView = ({ trend, onBack }) => {
     const [analysis, setAnalysis] = React.useState(null);
     const [chartData, setChartData] = React.useState([]);
     const [loading, setLoading] = React.useState(false);
-    const [chartPeriod, setChartPeriod] = React.useState('1mo'); // '1mo' or '1yr'
+    const [chartPeriod, setChartPeriod] = React.useState('1mo'); // '1mo', '3mo', '6mo' or '1yr'
     const [chartLoading, setChartLoading] = React.useState(false);
 
     // Initial Analysis Fetch
     React.useEffect(() => {
         if (!trend) return;
 
-        const controller = new AbortController();
-        const signal = controller.signal;
-
         setLoading(true);
         setAnalysis(null);
         setChartData([]);
@@ -24,28 +23,38 @@ const TrendDetailView = ({ trend, onBack }) => {
 
         const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
-        // ... (rest of logic is same, just updating signature above) ...
+        // Streamed analysis: chart first, then the reason as it is written
+        const source = new EventSource(`${apiUrl}/api/analyze/${encodeURIComponent(trend.keyword)}/stream`);
 
+        source.addEventListener('chart', (e) => {
+            const data = JSON.parse(e.data);
+            // Initial load: Slice to last 30 days to match '1mo' default
+            setChartData(data ? data.slice(-30) : []);
+        });
 
-        fetch(`${apiUrl}/api/analyze/${encodeURIComponent(trend.keyword)}`, { signal })
-            .then(res => res.json())
-            .then(data => {
-                if (!signal.aborted) {
-                    setAnalysis(data);
-                    // Initial load: Slice to last 30 days to match '1mo' default
-                    setChartData(data.chart_data ? data.chart_data.slice(-30) : []);
-                    setLoading(false);
-                }
-            })
-            .catch(err => {
-                if (err.name !== 'AbortError') {
-                    console.error("Failed to analyze:", err);
-                    setLoading(false);
-                }
-            });
+        source.addEventListener('reason', (e) => {
+            const text = JSON.parse(e.data);
+            setAnalysis(prev => ({ ...prev, reason: (prev?.reason || '') + text }));
+            setLoading(false);
+        });
+
+        source.addEventListener('done', (e) => {
+            const data = JSON.parse(e.data);
+            source.close();
+            setAnalysis(data);
+            setChartData(prev => prev.length > 0 ? prev : (data.chart_data ? data.chart_data.slice(-30) : []));
+            setLoading(false);
+        });
+
+        source.onerror = (err) => {
+            // EventSource would reconnect and re-run the analysis; stop instead
+            console.error("Failed to analyze:", err);
+            source.close();
+            setLoading(false);
+        };
 
         return () => {
-            controller.abort();
+            source.close();
         };
     }, [trend]);
 
@@ -144,7 +153,7 @@ const TrendDetailView = ({ trend, onBack }) => {
                             📊 검색량 추이
                         </h3>
                         <div className="flex bg-neutral-800 p-1 rounded-xl">
-                            {['1mo', '1yr'].map((p) => (
+                            {Object.keys(PERIOD_LABELS).map((p) => (
                                 <button
                                     key={p}
                                     onClick={() => handlePeriodChange(p)}
@@ -153,7 +162,7 @@ const TrendDetailView = ({ trend, onBack }) => {
                                         : 'text-gray-500 hover:text-gray-300 hover:bg-neutral-700/50'
                                         }`}
                                 >
-                                    {p === '1mo' ? '1개월' : '1년'}
+                                    {PERIOD_LABELS[p]}
                                 </button>
                             ))}
                         </div>
@@ -8,6 +8,9 @@ async def populate():
     # Run the collection logic (scrapes all categories -> saves to DB)
     await collector.collect_all_and_save()
     
+    # Writes are queued (write-behind); flush before exiting
+    await collector.writer.stop()
+    
     print("Manual population complete!")
 
 if __name__ == "__main__":
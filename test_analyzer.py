@@ -0,0 +1,209 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Offline: local SQLite storage, dummy key so the LLM path is taken
+DATA_DIR = tempfile.mkdtemp()
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(DATA_DIR, "ktrend.db")
+os.environ["SERIES_DB_PATH"] = os.path.join(DATA_DIR, "series.db")
+os.environ["KEYWORD_DB_PATH"] = os.path.join(DATA_DIR, "keywords.db")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from backend.services.analyzer import ReasonCleaner, TrendAnalyzer, clean_reason
+
+CHART = [{"date": "2024-01-01", "ratio": 100}]
+STREAMED = "**귤**이 [제철](https://news.example.com/a)이라 (news.nate.com) 수요가 늘었다."
+REASON = "귤이 제철이라  수요가 늘었다."
+
+class SlowDataLab:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    async def get_daily_trend(self, keyword, days=30):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return CHART
+
+class CachedDB:
+    async def get_analysis(self, keyword):
+        return {"keyword": keyword, "reason": "저장된 분석", "chart_data": [{"date": "2023-12-31", "ratio": 50}]}
+
+class EmptyDB:
+    async def get_analysis(self, keyword):
+        return None
+
+class SlowLLM:
+    """Stands in for AsyncOpenAI: counts completions, answers after a delay."""
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream=False, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.chunks(STREAMED)
+
+    async def chunks(self, text):
+        for i in range(0, len(text), 3):
+            await asyncio.sleep(0.005)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + 3]))])
+
+class NoopWriter:
+    def peek_analysis(self, keyword):
+        return None
+
+    def enqueue_analysis(self, keyword, reason, chart_data):
+        pass
+
+def make_analyzer(datalab, db):
+    analyzer = TrendAnalyzer()
+    analyzer.datalab = datalab
+    analyzer.db = db
+    analyzer.writer = NoopWriter()
+    analyzer.chart_wait = 0.05
+    return analyzer
+
+def test_cache_hit_does_not_wait_for_datalab():
+    analyzer = make_analyzer(SlowDataLab(delay=1.0), CachedDB())
+
+    async def run():
+        start = time.perf_counter()
+        result = await analyzer.analyze_trend("귤")
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+
+    assert result["reason"] == "저장된 분석"
+    assert result["chart_data"] == [{"date": "2023-12-31", "ratio": 50}]
+    assert elapsed < 0.5
+    assert "cache_lookup" in analyzer.timings
+
+def test_cache_hit_attaches_fresh_chart_when_ready():
+    analyzer = make_analyzer(SlowDataLab(delay=0), CachedDB())
+
+    result = asyncio.run(analyzer.analyze_trend("귤"))
+
+    assert result["chart_data"] == CHART
+
+def test_concurrent_misses_share_one_analysis():
+    datalab = SlowDataLab(delay=0)
+    llm = SlowLLM(delay=0.1)
+    analyzer = make_analyzer(datalab, EmptyDB())
+    analyzer.client = llm
+
+    async def run():
+        return await asyncio.gather(*(analyzer.analyze_trend("귤") for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert llm.calls == 1
+    assert datalab.calls == 1
+    assert all(r["reason"] == REASON for r in results)
+    assert analyzer.stats == {"calls": 10, "coalesced": 9}
+
+def test_cancelled_caller_does_not_cancel_shared_analysis():
+    llm = SlowLLM(delay=0.1)
+    analyzer = make_analyzer(SlowDataLab(delay=0), EmptyDB())
+    analyzer.client = llm
+
+    async def run():
+        first = asyncio.create_task(analyzer.analyze_trend("귤"))
+        second = asyncio.create_task(analyzer.analyze_trend("귤"))
+        await asyncio.sleep(0.02)
+        first.cancel() # Client disconnected
+        return await second
+
+    result = asyncio.run(run())
+
+    assert result["reason"] == REASON
+    assert llm.calls == 1
+
+def test_stream_sends_chart_first_and_matches_final_reason():
+    analyzer = make_analyzer(SlowDataLab(delay=0), EmptyDB())
+    analyzer.client = SlowLLM(delay=0)
+
+    async def run():
+        return [event async for event in analyzer.analyze_trend_stream("귤")]
+
+    events = asyncio.run(run())
+
+    assert events[0] == ("chart", CHART)
+    assert events[-1][0] == "done"
+    streamed = "".join(data for event, data in events if event == "reason")
+    assert streamed == events[-1][1]["reason"] == REASON
+
+def test_stream_joiner_gets_reason_of_shared_analysis():
+    llm = SlowLLM(delay=0.05)
+    analyzer = make_analyzer(SlowDataLab(delay=0), EmptyDB())
+    analyzer.client = llm
+
+    async def run():
+        first = asyncio.create_task(analyzer.analyze_trend("귤"))
+        await asyncio.sleep(0.1) # Joins mid-answer
+        events = [event async for event in analyzer.analyze_trend_stream("귤")]
+        await first
+        return events
+
+    events = asyncio.run(run())
+
+    assert llm.calls == 1
+    assert events[0] == ("chart", CHART)
+    streamed = "".join(data for event, data in events if event == "reason")
+    assert streamed == events[-1][1]["reason"] == REASON
+
+def test_disconnected_stream_is_cleaned_up():
+    analyzer = make_analyzer(SlowDataLab(delay=0), EmptyDB())
+    analyzer.client = SlowLLM(delay=0.05)
+
+    async def run():
+        stream = analyzer.analyze_trend_stream("귤")
+        assert (await stream.__anext__())[0] == "chart"
+        await stream.aclose() # Client disconnected
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        result = await analyzer._inflight["귤"]
+        return pending, result
+
+    pending, result = asyncio.run(run())
+
+    # Only the shared analysis keeps running; no orphaned queue getter
+    assert len(pending) == 1
+    assert result["reason"] == REASON
+    assert analyzer._subscribers == {} and analyzer._progress == {}
+
+def stream_through_cleaner(text, step):
+    cleaner = ReasonCleaner()
+    pieces = [cleaner.feed(text[i:i + step]) for i in range(0, len(text), step)]
+    return "".join(pieces) + cleaner.finish(), pieces
+
+def test_cleaner_holds_back_glued_and_partial_urls():
+    texts = [
+        "출처:https://news.example.com/a/b 에서 확인했다. 끝",
+        "가격은(http://shop.example.kr/x?y=1)처럼 올랐다",
+        "마지막 링크 https:/",
+        "링크는 htt",
+    ]
+    for text in texts:
+        for step in (1, 2, 3, 7):
+            streamed, pieces = stream_through_cleaner(text, step)
+            assert streamed == clean_reason(text), (text, step, streamed)
+            assert not any("http" in piece or piece.endswith("htt") for piece in pieces)
+
+if __name__ == "__main__":
+    test_cache_hit_does_not_wait_for_datalab()
+    test_cache_hit_attaches_fresh_chart_when_ready()
+    test_concurrent_misses_share_one_analysis()
+    test_cancelled_caller_does_not_cancel_shared_analysis()
+    test_stream_sends_chart_first_and_matches_final_reason()
+    test_stream_joiner_gets_reason_of_shared_analysis()
+    test_disconnected_stream_is_cleaned_up()
+    test_cleaner_holds_back_glued_and_partial_urls()
+    print("OK")
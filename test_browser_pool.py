@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.scrapers.browser_pool import BrowserPool
+
+class StubContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def close(self):
+        self.browser.open_contexts -= 1
+
+class StubBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.open_contexts = 0
+        self.peak_contexts = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.open_contexts += 1
+        self.peak_contexts = max(self.peak_contexts, self.open_contexts)
+        return StubContext(self)
+
+    async def close(self):
+        self.closed = True
+
+class StubPlaywright:
+    async def stop(self):
+        pass
+
+class StubLauncher:
+    """Offline stand-in for Chromium: records every browser it launches."""
+    def __init__(self):
+        self.browsers = []
+
+    async def __call__(self):
+        browser = StubBrowser()
+        self.browsers.append(browser)
+        return StubPlaywright(), browser
+
+def test_crashed_browser_is_relaunched_on_next_lease():
+    launcher = StubLauncher()
+    pool = BrowserPool(size=2, launcher=launcher)
+
+    async def run():
+        async with pool.context():
+            pass
+        launcher.browsers[0].connected = False # Chromium crashed
+        async with pool.context():
+            pass
+        await pool.stop()
+
+    asyncio.run(run())
+
+    assert pool.launch_count == 2
+    assert launcher.browsers[0].closed # Old handle cleaned up
+    assert launcher.browsers[1].closed # stop()
+
+def test_health_loop_relaunches_without_a_lease():
+    launcher = StubLauncher()
+    pool = BrowserPool(size=1, health_interval=0.01, launcher=launcher)
+
+    async def run():
+        await pool.start()
+        launcher.browsers[0].connected = False
+        await asyncio.sleep(0.05)
+        healthy = pool.is_healthy()
+        await pool.stop()
+        return healthy
+
+    assert asyncio.run(run())
+    assert pool.launch_count == 2
+
+def test_open_contexts_are_bounded_by_size():
+    launcher = StubLauncher()
+    pool = BrowserPool(size=2, launcher=launcher)
+
+    async def scrape():
+        async with pool.context():
+            await asyncio.sleep(0.02)
+
+    async def run():
+        await asyncio.gather(*(scrape() for _ in range(6)))
+        await pool.stop()
+
+    asyncio.run(run())
+
+    browser = launcher.browsers[0]
+    assert pool.launch_count == 1 # Shared by every scrape
+    assert browser.peak_contexts == 2
+    assert browser.open_contexts == 0
+
+if __name__ == "__main__":
+    test_crashed_browser_is_relaunched_on_next_lease()
+    test_health_loop_relaunches_without_a_lease()
+    test_open_contexts_are_bounded_by_size()
+    print("OK")
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from backend.services.collection_jobs import CollectionCoordinator
+
+def test_triggers_during_a_run_join_it():
+    runs = []
+
+    async def collect(job):
+        runs.append(job.id)
+        with job.stage("scrape"):
+            await asyncio.sleep(0.05)
+
+    async def run():
+        coordinator = CollectionCoordinator(collect)
+        first, first_coalesced = coordinator.trigger("startup")
+        second, second_coalesced = coordinator.trigger("manual")
+        await coordinator.run("stale")
+        return coordinator, first, second, first_coalesced, second_coalesced
+
+    coordinator, first, second, first_coalesced, second_coalesced = asyncio.run(run())
+
+    assert len(runs) == 1
+    assert first is second
+    assert (first_coalesced, second_coalesced) == (False, True)
+    assert first.triggers == ["startup", "manual", "stale"]
+    assert first.to_dict()["stages"][0]["status"] == "done"
+    assert not coordinator.is_running
+
+def test_failed_run_is_reported_and_releases_the_slot():
+    async def collect(job):
+        with job.stage("scrape"):
+            raise RuntimeError("browser crashed")
+
+    async def run():
+        coordinator = CollectionCoordinator(collect)
+        failed = await coordinator.run("manual")
+        retry, coalesced = coordinator.trigger("manual")
+        await retry.task
+        return failed, retry, coalesced
+
+    failed, retry, coalesced = asyncio.run(run())
+
+    status = failed.to_dict()
+    assert status["status"] == "failed"
+    assert status["error"] == "browser crashed"
+    assert status["stages"][0]["status"] == "failed"
+    assert retry is not failed and not coalesced
+
+def test_trigger_outside_the_loop_does_not_wedge_the_coordinator():
+    async def collect(job):
+        pass
+
+    async def run():
+        coordinator = CollectionCoordinator(collect)
+        try:
+            # What a sync scheduler job does: call trigger() from a worker thread
+            await asyncio.to_thread(coordinator.trigger, "scheduled")
+            assert False, "expected no running event loop"
+        except RuntimeError:
+            pass
+        assert not coordinator.is_running and coordinator.recent() == []
+        job, coalesced = coordinator.trigger("manual")
+        await job.task
+        return job, coalesced
+
+    job, coalesced = asyncio.run(run())
+
+    assert job.status == "succeeded" and not coalesced
+
+def test_scheduler_job_runs_collections():
+    runs = []
+
+    async def collect(job):
+        runs.append(job.triggers)
+
+    async def run():
+        coordinator = CollectionCoordinator(collect)
+        scheduler = AsyncIOScheduler()
+        scheduler.add_job(coordinator.scheduled, 'interval', seconds=0.1, args=["scheduled"])
+        scheduler.start()
+        for _ in range(50):
+            if len(runs) >= 2:
+                break
+            await asyncio.sleep(0.05)
+        scheduler.shutdown(wait=False)
+        return coordinator
+
+    coordinator = asyncio.run(run())
+
+    assert len(runs) >= 2
+    assert all(triggers == ["scheduled"] for triggers in runs)
+    assert not coordinator.is_running
+
+if __name__ == "__main__":
+    test_triggers_during_a_run_join_it()
+    test_failed_run_is_reported_and_releases_the_slot()
+    test_trigger_outside_the_loop_does_not_wedge_the_coordinator()
+    test_scheduler_job_runs_collections()
+    print("OK")
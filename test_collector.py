@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Offline: local storage under a temp dir
+DATA_DIR = tempfile.mkdtemp()
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(DATA_DIR, "ktrend.db")
+os.environ["SERIES_DB_PATH"] = os.path.join(DATA_DIR, "series.db")
+os.environ["KEYWORD_DB_PATH"] = os.path.join(DATA_DIR, "keywords.db")
+
+from backend.database import build_batch
+from backend.services.collection_jobs import CollectionCoordinator
+from backend.services.collector import TrendCollector
+
+def make_collector():
+    collector = TrendCollector()
+    runs = []
+
+    async def collect(job):
+        runs.append(job.triggers[0])
+
+    # Cold-start/stale triggers must not scrape for real
+    collector.jobs = CollectionCoordinator(collect)
+    collector.runs = runs
+    return collector
+
+def test_one_scrape_is_partitioned_into_every_batch():
+    collector = make_collector()
+    naver = [
+        {"keyword": "패딩", "source": "Naver Shopping", "category": "Fashion", "rank": 1},
+        {"keyword": "아이폰16", "source": "Naver Shopping", "category": "Digital", "rank": 1},
+        {"keyword": "귤", "source": "Naver Shopping", "category": "Food", "rank": 1},
+        {"keyword": "딸기", "source": "Naver Shopping", "category": "Food", "rank": 2},
+    ]
+    youtube = [{"keyword": "흑백요리사", "source": "YouTube", "category": "General", "rank": 1}]
+
+    batches = collector._build_batches(naver, youtube)
+
+    assert list(batches) == ["Fashion", "Digital", "Food", "Living", "all"]
+    assert [t["keyword"] for t in batches["Food"]] == ["귤", "딸기"]
+    assert [t["keyword"] for t in batches["Fashion"]] == ["패딩"]
+    # No live data for Living: mock fallback for that category only
+    assert batches["Living"] == collector.get_mock_trends("Living")
+    # Integrated batch: every Naver category, then YouTube
+    assert batches["all"] == naver + youtube
+
+def test_nothing_scraped_falls_back_to_mocks():
+    collector = make_collector()
+
+    batches = collector._build_batches([], [])
+
+    assert all(batches[cat] == collector.get_mock_trends(cat) for cat in ("Fashion", "Digital", "Food", "Living", "all"))
+
+class StaleDB:
+    """The DB still holds the previous cycle (the new one is queued for writing)."""
+    def __init__(self, batches):
+        self.batches = batches
+        self.reads = 0
+
+    async def get_latest_batches(self):
+        self.reads += 1
+        return self.batches
+
+def test_cache_miss_does_not_overwrite_newer_batches():
+    previous = {cat: build_batch(cat, [f"{cat} cycle1"]) for cat in ("Food", "Living")}
+    time.sleep(0.01)
+    current = build_batch("Food", ["Food cycle2"])
+
+    collector = make_collector()
+    collector.db = StaleDB(previous)
+    collector.cache.set("Food", current)
+
+    async def run():
+        await collector.get_trends(category_filter="Sports") # Miss: primes other categories
+        collector.cache.ttl = 0 # Food is stale: revalidated from the DB
+        await collector.get_trends(category_filter="Food")
+        await asyncio.sleep(0.01)
+        return await collector.get_trends(category_filter="Food")
+
+    food = asyncio.run(run())
+
+    assert food[0]["keyword"] == "Food cycle2"
+    assert collector.cache.peek("Living")[0]["keyword"] == "Living cycle1"
+    assert collector.db.reads >= 2
+    assert collector.runs == ["cold_start"] # Only for the empty category, not "stale"
+
+class StubNaverScraper:
+    def __init__(self, pool=None):
+        pass
+
+    async def get_trends(self):
+        # Fashion is partitioned first, but "아이폰16" ranks higher in Digital
+        return [
+            {"keyword": "패딩", "category": "Fashion", "rank": 1},
+            {"keyword": "아이폰 16", "category": "Fashion", "rank": 3},
+            {"keyword": "아이폰16", "category": "Digital", "rank": 1},
+        ]
+
+class StubYoutubeScraper:
+    def __init__(self, pool=None):
+        pass
+
+    async def get_trends(self):
+        return ["흑백요리사"]
+
+def test_best_ranked_spelling_becomes_canonical():
+    from backend.scrapers import naver_scraper, youtube_scraper
+    from backend.services.keywords import KeywordIndex
+
+    originals = naver_scraper.NaverShoppingScraper, youtube_scraper.YoutubeScraper
+    naver_scraper.NaverShoppingScraper, youtube_scraper.YoutubeScraper = StubNaverScraper, StubYoutubeScraper
+    try:
+        collector = make_collector()
+        collector.keywords = KeywordIndex(os.path.join(tempfile.mkdtemp(), "keywords.db"))
+
+        async def run():
+            naver, youtube = await collector._scrape_sources()
+            await collector._learn_keywords(collector._build_batches(naver, youtube))
+            return youtube
+
+        youtube = asyncio.run(run())
+    finally:
+        naver_scraper.NaverShoppingScraper, youtube_scraper.YoutubeScraper = originals
+
+    assert youtube == [{"keyword": "흑백요리사", "source": "YouTube", "category": "General", "rank": 1}]
+    assert collector.keywords.canonical("아이폰 16") == "아이폰16"
+
+if __name__ == "__main__":
+    test_one_scrape_is_partitioned_into_every_batch()
+    test_nothing_scraped_falls_back_to_mocks()
+    test_cache_miss_does_not_overwrite_newer_batches()
+    test_best_ranked_spelling_becomes_canonical()
+    print("OK")
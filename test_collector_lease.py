@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.collector_lease import CollectorLease
+from backend.services.collection_jobs import CollectionCoordinator
+
+def make_leases(ttl=60):
+    path = os.path.join(tempfile.mkdtemp(), "lease.db")
+    return CollectorLease(path, ttl=ttl), CollectorLease(path, ttl=ttl)
+
+def test_only_one_worker_holds_the_lease():
+    first, second = make_leases()
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert first.try_acquire() # Renewal
+    assert second.leader() == first.holder
+
+def test_lease_fails_over_when_leader_stops_renewing():
+    first, second = make_leases(ttl=0.2)
+
+    assert first.try_acquire()
+    time.sleep(0.3) # Leader died: no renewal
+    assert second.try_acquire()
+    assert not first.try_acquire()
+
+def test_release_hands_over_immediately():
+    first, second = make_leases()
+
+    first.try_acquire()
+    first.release()
+    assert second.try_acquire()
+
+def test_follower_forwards_triggers_to_leader():
+    leader, follower = make_leases()
+    leader.try_acquire()
+    leader.is_leader = True
+    runs = []
+
+    async def collect(job):
+        runs.append(job.id)
+
+    async def run():
+        coordinator = CollectionCoordinator(collect, lease=follower)
+        first = coordinator.trigger("manual")
+        await follower._request_task # The SQLite write runs off the loop
+        return first, coordinator.trigger("stale")
+
+    (job, coalesced), (throttled_job, throttled) = asyncio.run(run())
+
+    assert job is None and not coalesced
+    assert throttled_job is None and throttled # Forwarded less than a minute ago
+    assert runs == []
+    assert leader.take_request() == "manual"
+    assert leader.take_request() is None
+
+if __name__ == "__main__":
+    test_only_one_worker_holds_the_lease()
+    test_lease_fails_over_when_leader_stops_renewing()
+    test_release_hands_over_immediately()
+    test_follower_forwards_triggers_to_leader()
+    print("OK")
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.collection_jobs import CollectionCoordinator
+from backend.services.collector_lease import CollectorLease
+from backend.services.collector_runtime import CollectorRuntime
+
+class StubCollector:
+    """Stands in for TrendCollector: each run just takes `duration` seconds."""
+    def __init__(self, duration=0):
+        self.duration = duration
+        self.runs = []
+        self.jobs = CollectionCoordinator(self._collect)
+
+    async def _collect(self, job):
+        self.runs.append(job.triggers[0])
+        with job.stage("scrape"):
+            await asyncio.sleep(self.duration)
+
+    def start_collection(self, trigger):
+        return self.jobs.trigger(trigger)
+
+class StubPool:
+    def __init__(self):
+        self.running = False
+        self.starts = 0
+
+    async def start(self):
+        self.starts += 1
+        self.running = True
+
+    async def stop(self):
+        self.running = False
+
+    def is_healthy(self):
+        return self.running
+
+def test_start_collects_and_stop_waits_for_the_run():
+    collector, pool = StubCollector(duration=0.1), StubPool()
+    runtime = CollectorRuntime(collector, pool, interval_hours=1, shutdown_grace=5)
+
+    async def run():
+        await runtime.start()
+        health = runtime.health()
+        job = collector.jobs.current
+        await runtime.stop()
+        return health, job
+
+    health, job = asyncio.run(run())
+
+    assert collector.runs == ["startup"]
+    assert health["collecting"] and health["browser"] and health["current_job"]["job_id"] == job.id
+    assert job.status == "succeeded" # Finished within the grace period
+    assert not pool.running and not runtime.scheduler.running
+
+def test_stop_cancels_a_run_past_the_grace_period():
+    collector, pool = StubCollector(duration=5), StubPool()
+    runtime = CollectorRuntime(collector, pool, interval_hours=1, shutdown_grace=0.05)
+
+    async def run():
+        await runtime.start()
+        job = collector.jobs.current
+        await runtime.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job.status == "failed" and job.error == "cancelled (shutdown)"
+    assert not collector.jobs.is_running
+    assert not pool.running
+
+def test_losing_the_lease_stops_the_run_before_the_browser():
+    collector, pool = StubCollector(duration=5), StubPool()
+    runtime = CollectorRuntime(collector, pool, interval_hours=1, shutdown_grace=5)
+
+    async def run():
+        await runtime.start()
+        job = collector.jobs.current
+        await asyncio.sleep(0.01) # Run in flight
+        await runtime._stop_collecting() # Demoted by the lease
+        await asyncio.sleep(0.05)
+        state = (job.status, collector.jobs.is_running, pool.running)
+        await runtime.stop()
+        return state
+
+    status, running, pool_running = asyncio.run(run())
+
+    assert status == "failed" and not running
+    assert not pool_running and pool.starts == 1
+
+def test_scheduler_triggers_collections():
+    collector, pool = StubCollector(), StubPool()
+    runtime = CollectorRuntime(collector, pool, interval_hours=0.1 / 3600, shutdown_grace=1)
+
+    async def run():
+        await runtime.start()
+        for _ in range(50):
+            if "scheduled" in collector.runs:
+                break
+            await asyncio.sleep(0.05)
+        await runtime.stop()
+
+    asyncio.run(run())
+
+    assert collector.runs[0] == "startup"
+    assert "scheduled" in collector.runs
+
+def test_only_the_lease_holder_collects():
+    path = os.path.join(tempfile.mkdtemp(), "lease.db")
+    leader, follower = StubCollector(), StubCollector()
+    leader_runtime = CollectorRuntime(leader, StubPool(), lease=CollectorLease(path, ttl=0.3), shutdown_grace=1)
+    follower_runtime = CollectorRuntime(follower, StubPool(), lease=CollectorLease(path, ttl=0.3), shutdown_grace=1)
+
+    async def run():
+        await leader_runtime.start()
+        await asyncio.sleep(0.05)
+        await follower_runtime.start()
+        await asyncio.sleep(0.2)
+        health = (leader_runtime.health()["collecting"], follower_runtime.health()["collecting"])
+        await follower_runtime.stop()
+        await leader_runtime.stop()
+        return health
+
+    health = asyncio.run(run())
+
+    assert health == (True, False)
+    assert leader.runs == ["startup"] and follower.runs == []
+
+if __name__ == "__main__":
+    test_start_collects_and_stop_waits_for_the_run()
+    test_stop_cancels_a_run_past_the_grace_period()
+    test_losing_the_lease_stops_the_run_before_the_browser()
+    test_scheduler_triggers_collections()
+    test_only_the_lease_holder_collects()
+    print("OK")
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from postgrest.exceptions import APIError
+from backend.database import AsyncDatabase, Database, build_batch
+
+class FakeTable:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def insert(self, rows):
+        self.op = ("insert", rows)
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.op = ("upsert", rows)
+        return self
+
+    def select(self, columns):
+        self.op = ("select", None)
+        self.bounds = (0, None)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        error = self.client.errors.pop((self.name, self.op[0]), None)
+        if error:
+            raise error
+        self.client.calls.append((self.name, self.op[0], self.op[1] if self.op[0] != "select" else self.bounds))
+        if self.op[0] == "select":
+            # Like PostgREST: at most max_rows per response
+            start, end = self.bounds
+            end = min(end if end is not None else len(self.client.rows), start + self.client.max_rows - 1)
+            return SimpleNamespace(data=self.client.rows[start:end + 1])
+
+class FakeClient:
+    """Records writes; `errors` maps (table, op) to an exception raised once."""
+    def __init__(self, errors=None, rows=None, max_rows=1000):
+        self.errors = errors or {}
+        self.calls = []
+        self.rows = rows or [] # latest_trends view, ordered by category, rank
+        self.max_rows = max_rows
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+def make_db(errors=None):
+    db = Database()
+    db.client = FakeClient(errors)
+    return db
+
+def batches():
+    return {"Food": build_batch("Food", ["귤", "딸기"])}
+
+def test_transient_error_is_raised_without_legacy_insert():
+    db = make_db({("trends", "upsert"): APIError({"code": "503", "message": "Service Unavailable"})})
+
+    try:
+        db.save_trend_batches(batches())
+        assert False, "expected the error to propagate"
+    except APIError:
+        pass
+
+    assert db.batches_supported
+    assert db.client.calls == []
+
+def test_pointer_failure_never_falls_back_to_legacy():
+    db = make_db({("trend_batches", "upsert"): TimeoutError("read timeout")})
+
+    try:
+        db.save_trend_batches(batches())
+        assert False, "expected the error to propagate"
+    except TimeoutError:
+        pass
+
+    assert db.batches_supported
+    assert [(table, op) for table, op, _ in db.client.calls] == [("trends", "upsert")]
+
+def test_missing_schema_switches_to_legacy():
+    db = make_db({("trends", "upsert"): APIError({"code": "PGRST204", "message": "Could not find the 'batch_id' column"})})
+
+    db.save_trend_batches(batches())
+
+    assert not db.batches_supported
+    table, op, rows = db.client.calls[0]
+    assert (table, op) == ("trends", "insert")
+    assert "batch_id" not in rows[0]
+
+def test_latest_batches_are_read_past_the_max_rows_limit():
+    rows = [row for cat in ("Digital", "Fashion", "Food", "Living", "all") for row in build_batch(cat, [f"{cat} {i}" for i in range(300)])]
+    db = make_db()
+    db.client.rows = rows
+
+    batches = db.get_latest_batches()
+
+    assert {cat: len(trends) for cat, trends in batches.items()} == {cat: 300 for cat in ("Digital", "Fashion", "Food", "Living", "all")}
+    assert [bounds for _, op, bounds in db.client.calls] == [(0, 999), (1000, 1999)]
+
+class SlowBackend:
+    """Records the thread every call runs on."""
+    def __init__(self):
+        self.threads = []
+
+    def get_analysis(self, keyword):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return {"keyword": keyword}
+
+    def get_latest_batches(self):
+        self.threads.append(threading.current_thread().name)
+        raise TimeoutError("read timeout")
+
+def test_async_database_runs_calls_on_the_db_pool_and_times_them():
+    backend = SlowBackend()
+    db = AsyncDatabase(backend, max_workers=2)
+
+    async def run():
+        loop_thread = threading.current_thread().name
+        results = await asyncio.gather(db.get_analysis("귤"), db.get_analysis("딸기"))
+        try:
+            await db.get_latest_batches()
+            assert False, "expected the backend error to propagate"
+        except TimeoutError:
+            pass
+        return loop_thread, results
+
+    loop_thread, results = asyncio.run(run())
+    db.close()
+
+    assert results == [{"keyword": "귤"}, {"keyword": "딸기"}]
+    assert loop_thread not in backend.threads
+    assert all(name.startswith("db") for name in backend.threads)
+    analysis = db.timings["get_analysis"]
+    assert analysis["count"] == 2 and 50 <= analysis["max_ms"] <= analysis["total_ms"]
+    # Failed calls are timed too
+    assert db.timings["get_latest_batches"]["count"] == 1
+
+if __name__ == "__main__":
+    test_transient_error_is_raised_without_legacy_insert()
+    test_pointer_failure_never_falls_back_to_legacy()
+    test_missing_schema_switches_to_legacy()
+    test_latest_batches_are_read_past_the_max_rows_limit()
+    test_async_database_runs_calls_on_the_db_pool_and_times_them()
+    print("OK")
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.services.http_payload import RenderedCache, RenderedPayload
+
+UPDATED = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+
+def request(**headers):
+    """Stands in for a Starlette Request: only the headers are read."""
+    return SimpleNamespace(headers={name.replace("_", "-"): value for name, value in headers.items()})
+
+def test_etag_match_answers_304():
+    payload = RenderedPayload({"trends": ["귤"]}, last_modified=UPDATED)
+
+    assert payload.respond(request()).status_code == 200
+    assert payload.respond(request(if_none_match=payload.etag)).status_code == 304
+    assert payload.respond(request(if_none_match=f'"other", W/{payload.etag}')).status_code == 304
+    assert payload.respond(request(if_none_match="*")).status_code == 304
+    # A non-matching ETag wins over a matching date
+    mismatch = request(if_none_match='"other"', if_modified_since=format_datetime(UPDATED, usegmt=True))
+    assert payload.respond(mismatch).status_code == 200
+
+def test_if_modified_since_answers_304_when_not_newer():
+    payload = RenderedPayload({"trends": ["귤"]}, last_modified=UPDATED)
+    since = lambda ts: request(if_modified_since=format_datetime(ts, usegmt=True))
+
+    # Sub-second part dropped: the HTTP date of the batch itself matches
+    assert payload.respond(since(UPDATED.replace(microsecond=0))).status_code == 304
+    assert payload.respond(since(UPDATED + timedelta(hours=1))).status_code == 304
+    assert payload.respond(since(UPDATED - timedelta(seconds=1))).status_code == 200
+    assert payload.respond(request(if_modified_since="not a date")).status_code == 200
+
+def test_304_and_head_carry_validators_without_body():
+    payload = RenderedPayload({"trends": ["귤"]}, last_modified=UPDATED)
+    app = FastAPI()
+
+    @app.get("/trends")
+    @app.head("/trends")
+    def trends(request: Request):
+        return payload.respond(request)
+
+    client = TestClient(app)
+    full = client.get("/trends")
+    head = client.head("/trends")
+    not_modified = client.get("/trends", headers={"If-None-Match": payload.etag})
+
+    assert full.content == payload.body and full.json() == {"trends": ["귤"]}
+    assert head.status_code == 200 and head.content == b""
+    assert head.headers["etag"] == full.headers["etag"] == payload.etag
+    assert head.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == payload.etag
+
+def test_rendered_cache_expires_and_evicts_oldest():
+    cache = RenderedCache(ttl=60, max_entries=2)
+    first, second, third = (RenderedPayload({"n": n}) for n in range(3))
+    cache.put("a", first)
+    cache.put("b", second)
+    cache.put("c", third) # Over max_entries: "a" goes
+
+    assert cache.get("a") is None
+    assert cache.get("b") is second and cache.get("c") is third
+
+    expired = RenderedCache(ttl=0.01)
+    expired.put("a", RenderedPayload({"n": 0}))
+    time.sleep(0.02)
+    assert expired.get("a") is None and expired._entries == {}
+
+if __name__ == "__main__":
+    test_etag_match_answers_304()
+    test_if_modified_since_answers_304_when_not_newer()
+    test_304_and_head_carry_validators_without_body()
+    test_rendered_cache_expires_and_evicts_oldest()
+    print("OK")
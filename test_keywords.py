@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unicodedata
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.keywords import KeywordIndex, normalize_keyword
+
+def make_index():
+    return KeywordIndex(os.path.join(tempfile.mkdtemp(), "keywords.db"))
+
+def test_spelling_variants_share_a_key():
+    assert normalize_keyword("아이폰 16") == normalize_keyword("아이폰16")
+    assert normalize_keyword("Galaxy-S24") == normalize_keyword("galaxy s24")
+    # Decomposed jamo (NFD) vs composed syllables
+    assert normalize_keyword(unicodedata.normalize("NFD", "귤")) == normalize_keyword("귤")
+
+def test_collected_keywords_build_aliases():
+    index = make_index()
+    index.learn(["아이폰16", "Galaxy S24", "아이폰 16", "galaxy-s24"])
+
+    assert index.canonical("아이폰 16") == "아이폰16"
+    assert index.canonical("ＧＡＬＡＸＹ Ｓ24") == "Galaxy S24"
+    assert index.canonical("처음 보는 키워드 ") == "처음 보는 키워드"
+
+def test_longer_keywords_are_not_merged():
+    index = make_index()
+    index.learn(["아이폰", "아이폰 케이스", "아이폰 16", "아이폰16 프로"])
+
+    assert index.canonical("아이폰 케이스") == "아이폰 케이스"
+    assert index.canonical("아이폰 16") == "아이폰 16"
+    assert index.canonical("아이폰 16 프로") == "아이폰16 프로"
+
+def test_stale_table_reloads_off_the_event_loop():
+    index = make_index()
+    other = KeywordIndex(index.path, reload_interval=0)
+    index.learn(["피스타치오 스프레드"])
+
+    async def lookup():
+        # Served from the current table; the reload runs in a thread
+        first = other.canonical("피스타치오스프레드")
+        await other._reload_task
+        return first, other.canonical("피스타치오스프레드")
+
+    assert asyncio.run(lookup()) == ("피스타치오스프레드", "피스타치오 스프레드")
+
+def test_aliases_are_shared_through_storage():
+    index = make_index()
+    index.learn(["피스타치오 스프레드"])
+
+    other = KeywordIndex(index.path)
+    assert other.canonical("피스타치오스프레드") == "피스타치오 스프레드"
+
+if __name__ == "__main__":
+    test_spelling_variants_share_a_key()
+    test_collected_keywords_build_aliases()
+    test_longer_keywords_are_not_merged()
+    test_stale_table_reloads_off_the_event_loop()
+    test_aliases_are_shared_through_storage()
+    print("OK")
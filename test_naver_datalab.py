@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.naver_datalab import NaverDataLab
+from backend.services.series_store import SeriesStore
+
+# "True" search volume: keyword weight x day pattern
+WEIGHTS = {"귤": 1, "딸기": 2, "사과": 3, "배": 4, "감": 5, "포도": 6, "수박": 7, "참외": 8, "망고": 9}
+
+def volume(keyword, day):
+    return WEIGHTS[keyword] * ((day.toordinal() % 5) + 1)
+
+def datalab_transport(requests):
+    """
+    Offline DataLab: ratios are relative within one request (its max = 100),
+    so different requests are on different scales, like the real API.
+    """
+    def handler(request):
+        body = json.loads(request.content)
+        groups = [group["groupName"] for group in body["keywordGroups"]]
+        requests.append(groups)
+        start, end = date.fromisoformat(body["startDate"]), date.fromisoformat(body["endDate"])
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        peak = max(volume(keyword, d) for keyword in groups for d in days)
+        return httpx.Response(200, json={"results": [
+            {"title": keyword, "data": [{"period": d.isoformat(), "ratio": volume(keyword, d) / peak * 100} for d in days]}
+            for keyword in groups
+        ]})
+    return httpx.MockTransport(handler)
+
+def make_datalab(requests):
+    store = SeriesStore(os.path.join(tempfile.mkdtemp(), "series.db"))
+    return NaverDataLab(transport=datalab_transport(requests), store=store)
+
+def test_shared_scale_rescales_requests_through_the_anchor():
+    requests = []
+    datalab = make_datalab(requests)
+    keywords = list(WEIGHTS)
+
+    series = asyncio.run(datalab.get_daily_trends(keywords, days=30, anchor="귤", scale="shared"))
+
+    # 8 keywords besides the anchor, 4 per request: every request carries the anchor
+    assert len(requests) == 2 and all(groups[0] == "귤" and len(groups) <= 5 for groups in requests)
+    # One scale across requests: ratios follow the true volumes, global max = 100
+    peak = max(volume(k, date.fromisoformat(p["date"])) for k in keywords for p in series[k])
+    for keyword in keywords:
+        expected = [round(volume(keyword, date.fromisoformat(p["date"])) / peak * 100, 5) for p in series[keyword]]
+        assert [p["ratio"] for p in series[keyword]] == expected
+
+def test_self_scale_needs_no_anchor():
+    requests = []
+    datalab = make_datalab(requests)
+    keywords = list(WEIGHTS)
+
+    series = asyncio.run(datalab.get_daily_trends(keywords, days=30, anchor="귤"))
+
+    # 5 + 4 keywords: the anchor takes no extra slot
+    assert requests == [keywords[:5], keywords[5:]]
+    for keyword in keywords:
+        assert max(p["ratio"] for p in series[keyword]) == 100
+    # Cached for single-keyword charts
+    assert datalab.store.coverage("망고") is not None
+
+if __name__ == "__main__":
+    test_shared_scale_rescales_requests_through_the_anchor()
+    test_self_scale_needs_no_anchor()
+    print("OK")
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import sys
+from urllib.parse import parse_qs
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.scrapers.naver_http import NaverRankHttpClient
+from backend.scrapers.naver_scraper import NaverShoppingScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def fixture_transport():
+    """
+    Replays recorded getCategoryKeywordRank.naver responses (fixtures/naver_rank_<cid>.json).
+    Categories without a fixture answer 500 to exercise the per-category fallback.
+    """
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, text="<html></html>", headers={"Set-Cookie": "NNB=offline"})
+
+        form = parse_qs(request.content.decode())
+        cid = form["cid"][0]
+        path = os.path.join(FIXTURES, f"naver_rank_{cid}.json")
+        if not os.path.exists(path):
+            return httpx.Response(500)
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+
+        # Serve the requested page of the recorded ranking
+        page, count = int(form["page"][0]), int(form["count"][0])
+        payload["ranks"] = payload["ranks"][(page - 1) * count:page * count]
+        return httpx.Response(200, json=payload)
+
+    return httpx.MockTransport(handler)
+
+def test_http_fast_path():
+    client = NaverRankHttpClient(transport=fixture_transport())
+    ranks = asyncio.run(client.get_category_ranks({"50000000": 10, "50000008": 10}))
+
+    assert [item["keyword"] for item in ranks["50000000"][:3]] == ["여성 패딩", "니트 조끼", "롱부츠"]
+    assert ranks["50000000"][0]["rank"] == 1
+    assert ranks["50000008"] == []
+
+def test_scraper_falls_back_per_category():
+    scraper = NaverShoppingScraper(http_client=NaverRankHttpClient(transport=fixture_transport()))
+    requested = {}
+
+    async def fake_browser(categories):
+        requested.update(categories)
+        return {cid: [{"keyword": "크리스마스 트리", "category": cat}] for cid, cat in categories.items()}
+
+    scraper._scrape_with_browser = fake_browser
+    trends = asyncio.run(scraper.get_trends())
+
+    assert requested == {"50000008": "Living"}
+    assert len([t for t in trends if t["category"] == "Fashion"]) == 10
+    assert trends[-1] == {"keyword": "크리스마스 트리", "category": "Living"}
+
+def test_depth_pages_through_ranking():
+    client = NaverRankHttpClient(transport=fixture_transport())
+    ranks = asyncio.run(client.get_category_ranks({"50000003": 5, "50000006": 30}))
+
+    assert [item["rank"] for item in ranks["50000003"]] == [1, 2, 3, 4, 5]
+    # Depth 30 asks for pages 1-2; the recording only has 12 ranks
+    assert len(ranks["50000006"]) == 12
+
+if __name__ == "__main__":
+    test_http_fast_path()
+    test_scraper_falls_back_per_category()
+    test_depth_pages_through_ranking()
+    print("OK")
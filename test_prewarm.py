@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.prewarm import AnalysisPrewarmer
+
+class FakeAnalyzer:
+    def __init__(self, cached=()):
+        self.client = object()
+        self.keywords = SimpleNamespace(canonical=lambda keyword: keyword)
+        self.analyzed = []
+        cached = set(cached)
+        self.writer = SimpleNamespace(peek_analysis=lambda keyword: None)
+
+        async def get_analysis(keyword):
+            return {"reason": "저장됨"} if keyword in cached else None
+        self.db = SimpleNamespace(get_analysis=get_analysis)
+
+    async def analyze_trend(self, keyword):
+        self.analyzed.append(keyword)
+
+BATCHES = {
+    "Food": [{"keyword": "귤", "rank": 1}, {"keyword": "딸기", "rank": 2}, {"keyword": "곶감", "rank": 3}],
+    "Living": [{"keyword": "가습기", "rank": 1}, {"keyword": "귤", "rank": 2}],
+}
+
+def run_prewarm(analyzer, **kwargs):
+    async def run():
+        prewarmer = AnalysisPrewarmer(analyzer, workers=1, **kwargs)
+        prewarmer.enqueue(BATCHES)
+        await asyncio.wait_for(prewarmer._queue.join(), 1.0)
+        await prewarmer.stop()
+        return prewarmer
+    return asyncio.run(run())
+
+def test_top_ranks_first_and_deduplicated():
+    analyzer = FakeAnalyzer()
+    prewarmer = run_prewarm(analyzer, top_n=2, max_per_hour=10)
+
+    assert analyzer.analyzed == ["귤", "가습기", "딸기"]
+    assert prewarmer.stats["warmed"] == 3
+
+def test_stored_reasons_do_not_spend_budget():
+    analyzer = FakeAnalyzer(cached={"귤"})
+    prewarmer = run_prewarm(analyzer, top_n=3, max_per_hour=10)
+
+    assert "귤" not in analyzer.analyzed
+    assert prewarmer.stats["skipped_cached"] == 1
+    assert len(prewarmer._spent) == 3
+
+def test_budget_caps_analyses_per_hour():
+    async def run():
+        analyzer = FakeAnalyzer()
+        prewarmer = AnalysisPrewarmer(analyzer, workers=2, top_n=3, max_per_hour=2)
+        prewarmer.enqueue(BATCHES)
+        await asyncio.sleep(0.1)
+        await prewarmer.stop()
+        return analyzer, prewarmer
+
+    analyzer, prewarmer = asyncio.run(run())
+
+    assert len(analyzer.analyzed) == 2
+    assert prewarmer.stats["budget_waits"] >= 1
+
+if __name__ == "__main__":
+    test_top_ranks_first_and_deduplicated()
+    test_stored_reasons_do_not_spend_budget()
+    test_budget_caps_analyses_per_hour()
+    print("OK")
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.scrapers.resource_blocker import ResourceBlocker
+
+def test_heavy_assets_and_trackers_are_blocked():
+    blocker = ResourceBlocker()
+
+    for resource_type in ("image", "font", "media", "stylesheet"):
+        assert blocker.should_block("https://shopping.naver.com/x", resource_type)
+    for resource_type in ("document", "script", "xhr", "fetch"):
+        assert not blocker.should_block("https://shopping.naver.com/x", resource_type)
+    # Trackers are blocked whatever the type, subdomains included
+    assert blocker.should_block("https://www.google-analytics.com/collect", "xhr")
+    assert blocker.should_block("https://wcs.naver.net/wcslog.js", "script")
+    # Only real subdomains match, not look-alike hosts
+    assert not blocker.should_block("https://notdoubleclick.net/a.js", "script")
+
+def test_scraper_allowlists_win():
+    blocker = ResourceBlocker(allow_types=["stylesheet"], allow_domains=["ytimg.com"])
+
+    assert not blocker.should_block("https://shopping.naver.com/app.css", "stylesheet")
+    assert blocker.should_block("https://shopping.naver.com/a.png", "image")
+    assert not blocker.should_block("https://i.ytimg.com/vi/thumb.jpg", "image")
+
+class StubRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+def test_routes_are_aborted_or_continued_and_counted():
+    blocker = ResourceBlocker()
+    routes = [
+        StubRoute("https://shopping.naver.com/a.png", "image"),
+        StubRoute("https://shopping.naver.com/api/ranks", "xhr"),
+        StubRoute("https://www.googletagmanager.com/gtm.js", "script"),
+    ]
+
+    async def run():
+        for route in routes:
+            await blocker._handle(route)
+
+    asyncio.run(run())
+
+    assert [route.outcome for route in routes] == ["aborted", "continued", "aborted"]
+    assert blocker.stats["blocked"] == 2 and blocker.stats["allowed"] == 1
+    assert blocker.stats["by_type"] == {"image": 1, "script": 1}
+    assert blocker.stats["bytes_saved"] == 40_000 + 50_000
+
+if __name__ == "__main__":
+    test_heavy_assets_and_trackers_are_blocked()
+    test_scraper_allowlists_win()
+    test_routes_are_aborted_or_continued_and_counted()
+    print("OK")
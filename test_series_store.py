@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.naver_datalab import NaverDataLab
+from backend.services.series_store import SeriesStore
+
+def volume(day: date):
+    # Deterministic "true" search volume per day
+    return (day.toordinal() % 17) + 1
+
+def datalab_transport(requests):
+    """
+    Offline DataLab: every request is normalized to its own max = 100, like the real API.
+    """
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append((body["startDate"], body["endDate"]))
+        start, end = date.fromisoformat(body["startDate"]), date.fromisoformat(body["endDate"])
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        peak = max(volume(d) for d in days)
+        return httpx.Response(200, json={"results": [
+            {"title": group["groupName"], "data": [{"period": d.isoformat(), "ratio": volume(d) / peak * 100} for d in days]}
+            for group in body["keywordGroups"]
+        ]})
+    return httpx.MockTransport(handler)
+
+def expected(start: date, end: date):
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    peak = max(volume(d) for d in days)
+    return [round(volume(d) / peak * 100, 5) for d in days]
+
+def make_datalab(requests):
+    store = SeriesStore(os.path.join(tempfile.mkdtemp(), "series.db"))
+    return NaverDataLab(transport=datalab_transport(requests), store=store)
+
+def test_second_request_needs_no_upstream_call():
+    requests = []
+    datalab = make_datalab(requests)
+    today = date.today()
+
+    first = asyncio.run(datalab.get_daily_trend("귤", days=30))
+    second = asyncio.run(datalab.get_daily_trend("귤", days=30))
+
+    assert len(requests) == 1
+    assert first == second
+    assert [p["ratio"] for p in first] == expected(today - timedelta(days=30), today)
+
+def test_incremental_refresh_fetches_only_new_days():
+    requests = []
+    datalab = make_datalab(requests)
+    today = date.today()
+
+    # Stored 3 days ago, on an arbitrary scale
+    old_end = today - timedelta(days=3)
+    old_start = today - timedelta(days=40)
+    days = [old_start + timedelta(days=i) for i in range((old_end - old_start).days + 1)]
+    datalab.store.merge("귤", [{"date": d.isoformat(), "ratio": volume(d) * 3.7} for d in days])
+    conn = datalab.store._conn()
+    with conn:
+        conn.execute("UPDATE search_volume_meta SET fetched_on = ?", (old_end.isoformat(),))
+
+    series = asyncio.run(datalab.get_daily_trend("귤", days=30))
+
+    assert requests == [((old_end - timedelta(days=NaverDataLab.OVERLAP_DAYS)).isoformat(), today.isoformat())]
+    assert [p["ratio"] for p in series] == expected(today - timedelta(days=30), today)
+
+def test_shorter_period_is_sliced_from_stored_year():
+    requests = []
+    datalab = make_datalab(requests)
+    today = date.today()
+
+    asyncio.run(datalab.get_daily_trend("귤", days=365))
+    month = asyncio.run(datalab.get_daily_trend("귤", days=30))
+
+    assert len(requests) == 1
+    assert [p["ratio"] for p in month] == expected(today - timedelta(days=30), today)
+
+def test_longer_period_fetches_only_uncovered_range():
+    requests = []
+    datalab = make_datalab(requests)
+    today = date.today()
+
+    asyncio.run(datalab.get_daily_trend("귤", days=30))
+    year = asyncio.run(datalab.get_daily_trend("귤", days=365))
+
+    month_start = today - timedelta(days=30)
+    assert requests[1] == ((today - timedelta(days=365)).isoformat(), (month_start + timedelta(days=NaverDataLab.OVERLAP_DAYS)).isoformat())
+    assert [p["ratio"] for p in year] == expected(today - timedelta(days=365), today)
+
+if __name__ == "__main__":
+    test_second_request_needs_no_upstream_call()
+    test_incremental_refresh_fetches_only_new_days()
+    test_shorter_period_is_sliced_from_stored_year()
+    test_longer_period_fetches_only_uncovered_range()
+    print("OK")
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.database import build_batch
+from backend.local_store import SQLiteStore, ReplicatedStore
+from backend.services.write_queue import WriteBehindQueue
+
+def make_store():
+    return SQLiteStore(os.path.join(tempfile.mkdtemp(), "ktrend.db"))
+
+def test_latest_batch_per_category():
+    db = make_store()
+    db.save_trends("Food", [{"keyword": "귤"}, {"keyword": "고구마"}])
+    db.save_trends("Food", [{"keyword": "딸기"}, {"keyword": "곶감"}, {"keyword": "햅쌀"}])
+    db.save_trends("Living", ["가습기"])
+
+    food = db.get_latest_trends("Food")
+    assert [t["keyword"] for t in food] == ["딸기", "곶감", "햅쌀"]
+    assert len({t["batch_id"] for t in food}) == 1
+
+    batches = db.get_latest_batches()
+    assert set(batches) == {"Food", "Living"}
+    assert batches["Living"][0]["rank"] == 1
+
+def test_analysis_upsert():
+    db = make_store()
+    assert db.get_analysis("피스타치오") is None
+
+    db.save_analysis("피스타치오", "old", [])
+    db.save_analysis("피스타치오", "두바이 초콜릿 재료", [{"date": "2026-10-01", "ratio": 100}])
+
+    analysis = db.get_analysis("피스타치오")
+    assert analysis["reason"] == "두바이 초콜릿 재료"
+    assert analysis["chart_data"][0]["ratio"] == 100
+
+def test_replica_reads_local_and_backfills():
+    # A second SQLiteStore stands in for Supabase
+    primary, replica = make_store(), make_store()
+    primary.save_trends("all", ["흑백요리사"])
+    primary.save_analysis("흑백요리사", "넷플릭스 예능", [])
+
+    db = ReplicatedStore(primary, replica)
+    assert db.get_latest_trends("all")[0]["keyword"] == "흑백요리사"
+    assert replica.get_latest_trends("all")[0]["batch_id"] == primary.get_latest_trends("all")[0]["batch_id"]
+    assert db.get_analysis("흑백요리사")["reason"] == "넷플릭스 예능"
+    assert replica.get_analysis("흑백요리사") is not None
+
+    db.save_trends("Digital", ["아이폰 16"])
+    assert primary.get_latest_trends("Digital") == replica.get_latest_trends("Digital")
+
+def test_replica_merges_missing_and_newer_batches():
+    primary, replica = make_store(), make_store()
+    db = ReplicatedStore(primary, replica, check_interval=0)
+    db.save_trends("Food", ["귤"])
+    # Written to Supabase by another process (e.g. the collector worker)
+    primary.save_trends("Living", ["가습기"])
+    primary.save_trends("Food", ["딸기"])
+
+    # Living is missing locally: the primary is asked and newer batches merged in
+    batches = db.get_latest_batches()
+    assert batches["Living"][0]["keyword"] == "가습기"
+    assert batches["Food"][0]["keyword"] == "딸기"
+    assert replica.get_latest_trends("Living")[0]["keyword"] == "가습기"
+
+def test_replica_rechecks_stale_batches():
+    primary, replica = make_store(), make_store()
+    db = ReplicatedStore(primary, replica, check_interval=0)
+    for category in ["all", "Fashion", "Digital", "Food", "Living"]:
+        db.save_trends(category, ["귤"])
+    primary.save_trends("Food", ["딸기"])
+
+    # Complete and fresh: served locally without asking the primary
+    assert db.get_latest_batches()["Food"][0]["keyword"] == "귤"
+
+    db.max_age = 0
+    assert db.get_latest_batches()["Food"][0]["keyword"] == "딸기"
+    assert db.get_latest_trends("Food")[0]["keyword"] == "딸기"
+
+class PartialWriteStore:
+    """
+    Async store whose first bulk write lands the rows but fails before the
+    pointer moves (like a Supabase timeout between the two requests).
+    """
+    def __init__(self, store):
+        self.store = store
+        self.failed = False
+
+    async def save_trend_batches(self, batches):
+        if not self.failed:
+            self.failed = True
+            conn = self.store._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO trends (category, keyword, rank, created_at, batch_id) VALUES (?, ?, ?, ?, ?)",
+                    [(row["category"], row["keyword"], row["rank"], row["created_at"], row["batch_id"]) for rows in batches.values() for row in rows]
+                )
+            raise TimeoutError("pointer upsert timed out")
+        self.store.save_trend_batches(batches)
+
+def test_retry_after_partial_write_does_not_duplicate():
+    store = make_store()
+    queue = WriteBehindQueue(db=PartialWriteStore(store), flush_interval=0)
+
+    assert asyncio.run(queue._write("save_trend_batches", {"Food": build_batch("Food", ["귤", "딸기"])}))
+
+    assert [t["keyword"] for t in store.get_latest_trends("Food")] == ["귤", "딸기"]
+    assert queue.stats["retries"] == 1
+
+class FlakyStore:
+    """Wraps a store; the next `failures` bulk writes raise."""
+    def __init__(self, store, failures):
+        self.store = store
+        self.failures = failures
+        self.writes = 0
+
+    def save_trend_batches(self, batches):
+        self.writes += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Supabase unreachable")
+        self.store.save_trend_batches(batches)
+
+def test_replica_is_written_while_primary_is_down():
+    primary = FlakyStore(make_store(), failures=1)
+    replica = FlakyStore(make_store(), failures=0)
+    db = ReplicatedStore(primary, replica)
+    batches = {"Food": build_batch("Food", ["귤"])}
+
+    try:
+        db.save_trend_batches(batches)
+        assert False, "expected the primary error to propagate"
+    except ConnectionError:
+        pass
+    assert replica.store.get_latest_trends("Food")[0]["keyword"] == "귤"
+
+    # Retry only writes the side that failed
+    db.save_trend_batches(batches)
+    assert (primary.writes, replica.writes) == (2, 1)
+    assert primary.store.get_latest_trends("Food")[0]["keyword"] == "귤"
+
+if __name__ == "__main__":
+    test_latest_batch_per_category()
+    test_analysis_upsert()
+    test_replica_reads_local_and_backfills()
+    test_replica_merges_missing_and_newer_batches()
+    test_replica_rechecks_stale_batches()
+    test_retry_after_partial_write_does_not_duplicate()
+    test_replica_is_written_while_primary_is_down()
+    print("OK")
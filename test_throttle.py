@@ -0,0 +1,58 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.scrapers.throttle import HostThrottle
+
+def test_same_host_requests_are_spaced():
+    throttle = HostThrottle(delay=0.05)
+    starts = []
+
+    async def fetch(path):
+        await throttle.wait(f"https://search.shopping.naver.com/{path}")
+        starts.append(time.monotonic())
+
+    async def run():
+        await asyncio.gather(*(fetch(i) for i in range(4)))
+
+    asyncio.run(run())
+
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert len(starts) == 4
+    assert all(gap >= 0.045 for gap in gaps)
+
+def test_different_hosts_do_not_wait_for_each_other():
+    throttle = HostThrottle(delay=0.5)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(
+            throttle.wait("https://search.shopping.naver.com/a"),
+            throttle.wait("https://datalab.naver.com/b"),
+            throttle.wait("https://www.youtube.com/c")
+        )
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 0.1
+
+def test_no_wait_once_the_delay_has_passed():
+    throttle = HostThrottle(delay=0.05)
+
+    async def run():
+        await throttle.wait("https://datalab.naver.com/a")
+        await asyncio.sleep(0.06)
+        start = time.monotonic()
+        await throttle.wait("https://datalab.naver.com/b")
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 0.02
+
+if __name__ == "__main__":
+    test_same_host_requests_are_spaced()
+    test_different_hosts_do_not_wait_for_each_other()
+    test_no_wait_once_the_delay_has_passed()
+    print("OK")
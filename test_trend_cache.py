@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.trend_cache import TrendCache
+
+class Loader:
+    """Async loader returning v1, v2, ... after `delay`; counts calls."""
+    def __init__(self, delay=0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("db down")
+        return [f"v{self.calls}"]
+
+def test_concurrent_misses_share_one_load():
+    cache = TrendCache(ttl=60)
+    loader = Loader(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("Food", loader) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert loader.calls == 1
+    assert all(result == ["v1"] for result in results)
+    assert cache.stats["misses"] == 10 and cache.stats["refreshes"] == 1
+
+def test_fresh_entry_is_a_hit():
+    cache = TrendCache(ttl=60)
+    loader = Loader()
+
+    async def run():
+        await cache.get_or_load("Food", loader)
+        return await cache.get_or_load("Food", loader)
+
+    assert asyncio.run(run()) == ["v1"]
+    assert loader.calls == 1
+    assert cache.stats["hits"] == 1
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = TrendCache(ttl=0)
+    loader = Loader(delay=0.05)
+    cache.set("Food", ["v0"])
+
+    async def run():
+        # Stale: answered from memory right away, refreshed in the background
+        served = [await cache.get_or_load("Food", loader) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        return served, cache.peek("Food")
+
+    served, refreshed = asyncio.run(run())
+
+    assert served == [["v0"]] * 5
+    assert loader.calls == 1 # One refresh in flight per key
+    assert refreshed == ["v1"]
+    assert cache.stats["stale_hits"] == 5
+
+def test_failed_or_empty_refresh_keeps_the_old_entry():
+    cache = TrendCache(ttl=0)
+    cache.set("Food", ["v0"])
+
+    async def empty():
+        return None
+
+    async def run():
+        await cache.get_or_load("Food", Loader(fail=True))
+        await asyncio.sleep(0.01)
+        await cache.get_or_load("Food", empty)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert cache.peek("Food") == ["v0"]
+    assert cache.stats["refresh_errors"] == 1 and cache.stats["refreshes"] == 2
+
+if __name__ == "__main__":
+    test_concurrent_misses_share_one_load()
+    test_fresh_entry_is_a_hit()
+    test_stale_entry_is_served_while_one_refresh_runs()
+    test_failed_or_empty_refresh_keeps_the_old_entry()
+    print("OK")
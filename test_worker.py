@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Offline: local storage under a temp dir, no browser is launched
+DATA_DIR = tempfile.mkdtemp()
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(DATA_DIR, "ktrend.db")
+os.environ["SERIES_DB_PATH"] = os.path.join(DATA_DIR, "series.db")
+os.environ["KEYWORD_DB_PATH"] = os.path.join(DATA_DIR, "keywords.db")
+os.environ["COLLECTOR_LEASE_PATH"] = os.path.join(DATA_DIR, "lease.db")
+
+from fastapi.testclient import TestClient
+
+from backend import worker
+from backend.services.collection_jobs import CollectionCoordinator
+
+def test_collect_starts_a_job_and_reports_it():
+    async def collect(job):
+        with job.stage("scrape"):
+            await asyncio.sleep(0)
+
+    # Replace the real scrape; no lease, so this process collects
+    worker.collector.jobs = CollectionCoordinator(collect)
+    client = TestClient(worker.app)
+
+    accepted = client.post("/collect")
+    job_id = accepted.json()["job_id"]
+
+    assert accepted.status_code == 202 and accepted.json()["status"] == "accepted"
+    assert client.get(f"/jobs/{job_id}").json()["status"] in ("running", "succeeded")
+    assert client.get("/jobs").json()["jobs"][0]["job_id"] == job_id
+    assert client.get("/jobs/unknown").status_code == 404
+
+    health = client.get("/health").json()
+    assert health["browser"] is False # Lifespan not run: pool never started
+    assert "lease" in health and "last_job" in health
+
+if __name__ == "__main__":
+    test_collect_starts_a_job_and_reports_it()
+    print("OK")